@@ -0,0 +1 @@
+# Soros Chatbot API
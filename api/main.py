@@ -3,39 +3,177 @@ FastAPI Backend for Soros Chatbot
 Provides REST API endpoints for the React frontend
 """
 
+import asyncio
+import importlib.util
+import multiprocessing
 import os
 import sys
 import tempfile
+from contextlib import asynccontextmanager, suppress
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
 import logging
 
+import anyio.to_thread
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict
+import aiofiles
+from cachetools import TTLCache
+import orjson
 import uvicorn
 
-# Add src to path
-sys.path.append(str(Path(__file__).parent.parent / "src"))
-
 # Import configuration
-sys.path.append(str(Path(__file__).parent.parent))
 from config import Config
 
 from src.soros_chatbot import SorosChatbot
-from src.pdf_reader import PDFReader
-from src.soros_knowledge_base import SorosKnowledgeBase
+from src.pdf_reader import read_pdf_file
+from src.semantic_cache import SemanticCache
+from src.redis_cache import RedisResponseCache
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, Config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Probe endpoints only depend on startup configuration, so their bodies are serialised once
+_CONFIG_JSON_BYTES = orjson.dumps(Config.public_settings())
+_HEALTH_JSON_BYTES = {
+    available: orjson.dumps({
+        "status": "healthy",
+        "chatbot_available": available,
+        "api_key_set": bool(Config.OPENAI_API_KEY),
+        "model": Config.OPENAI_MODEL,
+        "temperature": Config.OPENAI_TEMPERATURE
+    })
+    for available in (False, True)
+}
+_READY_JSON_BYTES = {
+    ready: orjson.dumps({"ready": ready})
+    for ready in (False, True)
+}
+
+# Global chatbot instance
+chatbot: Optional[SorosChatbot] = None
+
+# Global semantic response cache
+semantic_cache: Optional[SemanticCache] = None
+
+# Exact-match response cache shared by all workers, when REDIS_URL is set
+redis_cache: Optional[RedisResponseCache] = None
+
+# Worker processes for CPU-bound PDF parsing
+pdf_parse_pool: Optional[ProcessPoolExecutor] = None
+
+# Concept search results keyed by lowercased query, cleared whenever the knowledge base changes
+search_cache = TTLCache(maxsize=Config.SEARCH_CACHE_SIZE, ttl=Config.SEARCH_CACHE_TTL_SECONDS)
+search_cache_stats = {'hits': 0, 'misses': 0}
+
+def _create_chatbot() -> SorosChatbot:
+    """Validate configuration and build the chatbot (blocking)"""
+    Config.validate()
+    logger.info("Configuration validated successfully")
+    
+    return SorosChatbot(
+        api_key=Config.OPENAI_API_KEY,
+        model=Config.OPENAI_MODEL,
+        embedding_model=Config.EMBEDDING_MODEL if Config.SEMANTIC_SEARCH_ENABLED else None
+    )
+
+def _create_semantic_cache() -> SemanticCache:
+    """Open the semantic response cache and load its embedding model (blocking)"""
+    return SemanticCache(
+        db_path=Config.CACHE_DIR / "semantic_cache.db",
+        model_name=Config.EMBEDDING_MODEL,
+        threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+        ttl_seconds=Config.SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES
+    )
+
+async def _init_chatbot(app: FastAPI):
+    """Initialize the chatbot in the background so the worker can accept probes meanwhile"""
+    global chatbot
+    
+    try:
+        chatbot = await asyncio.to_thread(_create_chatbot)
+        app.state.chatbot = chatbot
+        logger.info("Soros Chatbot initialized successfully")
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        logger.error("Please check your .env file and ensure OPENAI_API_KEY is set")
+    except Exception as e:
+        logger.error(f"Failed to initialize chatbot: {e}")
+
+async def _init_semantic_cache():
+    """Initialize the semantic cache in the background"""
+    global semantic_cache
+    
+    try:
+        semantic_cache = await asyncio.to_thread(_create_semantic_cache)
+        logger.info("Semantic cache initialized")
+    except Exception as e:
+        logger.warning(f"Semantic cache disabled: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Set up executors, start chatbot initialization and tear down on exit"""
+    global pdf_parse_pool, redis_cache
+    
+    # Bound the threads used for blocking chatbot calls and FastAPI's own sync work
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=Config.THREAD_POOL_SIZE)
+    )
+    anyio.to_thread.current_default_thread_limiter().total_tokens = Config.THREAD_POOL_SIZE
+    
+    if Config.PDF_PARSE_WORKERS > 0:
+        # Workers fork from a server process that has already imported the PDF parsers
+        if sys.platform.startswith("win"):
+            mp_context = multiprocessing.get_context("spawn")
+        else:
+            mp_context = multiprocessing.get_context("forkserver")
+            # src.pdf_reader imports its parsers lazily, so they are named here to be preloaded too
+            parsers = [name for name in ("fitz", "pdfplumber") if importlib.util.find_spec(name)]
+            mp_context.set_forkserver_preload(["src.pdf_reader", *parsers])
+        pdf_parse_pool = ProcessPoolExecutor(max_workers=Config.PDF_PARSE_WORKERS, mp_context=mp_context)
+    
+    if Config.REDIS_URL:
+        try:
+            redis_cache = RedisResponseCache(Config.REDIS_URL, ttl_seconds=Config.SEMANTIC_CACHE_TTL_SECONDS)
+            logger.info("Shared Redis cache enabled")
+        except Exception as e:
+            logger.warning(f"Shared Redis cache disabled: {e}")
+    
+    # The chatbot and embedding model load concurrently; /ready reports 503 until the chatbot is up
+    app.state.chatbot = None
+    init_tasks = [_init_chatbot(app)]
+    if Config.SEMANTIC_CACHE_ENABLED:
+        init_tasks.append(_init_semantic_cache())
+    init_task = asyncio.gather(*init_tasks)
+    
+    yield
+    
+    init_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await init_task
+    if chatbot:
+        await chatbot.aclose()
+    if redis_cache:
+        await redis_cache.close()
+    if pdf_parse_pool:
+        pdf_parse_pool.shutdown(cancel_futures=True)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Soros Chatbot API",
     description="API for the Soros Chatbot with PDF processing capabilities",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware for React frontend
@@ -52,8 +190,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global chatbot instance
-chatbot: Optional[SorosChatbot] = None
+class _StreamSafeGZipMiddleware(GZipMiddleware):
+    """GZip that passes streamed routes through untouched"""
+    
+    # Older Starlette releases also compress text/event-stream, holding the small SSE frames in the compressor
+    UNCOMPRESSED_PATHS = frozenset({"/chat/stream"})
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+        else:
+            await super().__call__(scope, receive, send)
+
+# Compress larger JSON payloads such as concept search results and PDF listings
+app.add_middleware(_StreamSafeGZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Pydantic models for request/response
 class ChatRequest(BaseModel):
@@ -61,17 +211,26 @@ class ChatRequest(BaseModel):
     use_context: bool = True
 
 class ChatResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     response: str
     success: bool
     error: Optional[str] = None
 
 class SystemStatsResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     loaded_pdfs: int
     total_quotes: int
     total_concepts: int
     conversation_messages: int
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
+    embedding_cache_size: int = 0
 
 class PDFInfoResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     path: str
     word_count: int
     chunks: int
@@ -79,11 +238,15 @@ class PDFInfoResponse(BaseModel):
     concepts_found: int
 
 class ConceptSearchResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     concept: str
     definition: str
     key_points: List[str]
 
 class UploadResponse(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+    
     success: bool
     filename: str
     word_count: int
@@ -91,29 +254,6 @@ class UploadResponse(BaseModel):
     concepts_found: int
     error: Optional[str] = None
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the chatbot on startup"""
-    global chatbot
-    
-    try:
-        # Validate configuration
-        Config.validate()
-        logger.info("Configuration validated successfully")
-        
-        # Initialize chatbot with configuration
-        chatbot = SorosChatbot(
-            api_key=Config.OPENAI_API_KEY,
-            model=Config.OPENAI_MODEL
-        )
-        logger.info("Soros Chatbot initialized successfully")
-        
-    except ValueError as e:
-        logger.error(f"Configuration error: {e}")
-        logger.error("Please check your .env file and ensure OPENAI_API_KEY is set")
-    except Exception as e:
-        logger.error(f"Failed to initialize chatbot: {e}")
-
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -127,27 +267,55 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "chatbot_available": chatbot is not None,
-        "api_key_set": bool(Config.OPENAI_API_KEY),
-        "model": Config.OPENAI_MODEL,
-        "temperature": Config.OPENAI_TEMPERATURE
-    }
+    return Response(_HEALTH_JSON_BYTES[chatbot is not None], media_type="application/json")
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the chatbot has finished initializing"""
+    if app.state.chatbot is None:
+        return Response(_READY_JSON_BYTES[False], status_code=503, media_type="application/json")
+    return Response(_READY_JSON_BYTES[True], media_type="application/json")
 
 @app.get("/config")
 async def get_config():
     """Get current configuration (without sensitive data)"""
-    return {
-        "model": Config.OPENAI_MODEL,
-        "temperature": Config.OPENAI_TEMPERATURE,
-        "max_tokens": Config.OPENAI_MAX_TOKENS,
-        "api_host": Config.API_HOST,
-        "api_port": Config.API_PORT,
-        "frontend_port": Config.FRONTEND_PORT,
-        "debug": Config.DEBUG,
-        "log_level": Config.LOG_LEVEL
-    }
+    return Response(_CONFIG_JSON_BYTES, media_type="application/json")
+
+async def _lookup_cached_response(message: str, namespace: str) -> Optional[str]:
+    """Check the shared exact-match tier first, then the local paraphrase cache"""
+    if redis_cache:
+        cached = await redis_cache.lookup(message, namespace)
+        if cached is not None:
+            return cached
+    
+    if semantic_cache:
+        # A locked or mismatched cache falls back to asking the model rather than failing the request
+        try:
+            cached = await asyncio.to_thread(semantic_cache.lookup, message, namespace)
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            cached = None
+        
+        if cached is not None:
+            if redis_cache:
+                await redis_cache.store(message, cached, namespace)
+            return cached
+    
+    return None
+
+async def _store_cached_response(message: str, response: str, namespace: str):
+    """Store a fresh response in every enabled cache tier"""
+    if redis_cache:
+        await redis_cache.store(message, response, namespace)
+    if semantic_cache:
+        try:
+            await asyncio.to_thread(semantic_cache.store, message, response, namespace)
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+def _sse_event(payload: Dict) -> bytes:
+    """Encode a payload as a Server-Sent Events data frame"""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
@@ -158,8 +326,19 @@ async def chat(request: ChatRequest):
             detail="Chatbot not available. Check your .env file and ensure OPENAI_API_KEY is set."
         )
     
+    # Cached answers differ depending on whether knowledge base context was used
+    namespace = "context" if request.use_context else "plain"
+    
     try:
-        response = chatbot.chat(request.message, use_context=request.use_context)
+        cached = await _lookup_cached_response(request.message, namespace)
+        if cached is not None:
+            # Cached answers join the conversation like fresh ones, as in SorosChatbot.chat
+            await asyncio.to_thread(chatbot._remember, request.message, cached)
+            return ChatResponse(response=cached, success=True)
+        
+        response = await chatbot.achat(request.message, request.use_context)
+        await _store_cached_response(request.message, response, namespace)
+        
         return ChatResponse(response=response, success=True)
     except Exception as e:
         logger.error(f"Chat error: {e}")
@@ -169,13 +348,70 @@ async def chat(request: ChatRequest):
             error=str(e)
         )
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Chat with the Soros chatbot, streaming the response as Server-Sent Events"""
+    if not chatbot:
+        raise HTTPException(
+            status_code=503, 
+            detail="Chatbot not available. Check your .env file and ensure OPENAI_API_KEY is set."
+        )
+    
+    namespace = "context" if request.use_context else "plain"
+    
+    async def events():
+        try:
+            cached = await _lookup_cached_response(request.message, namespace)
+            if cached is not None:
+                await asyncio.to_thread(chatbot._remember, request.message, cached)
+                yield _sse_event({"delta": cached})
+            else:
+                parts = []
+                async for delta in chatbot.achat_stream(request.message, request.use_context):
+                    parts.append(delta)
+                    yield _sse_event({"delta": delta})
+                await _store_cached_response(request.message, "".join(parts), namespace)
+            
+            yield _sse_event({"done": True})
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}")
+            yield _sse_event({"error": str(e)})
+    
+    # X-Accel-Buffering stops nginx from holding back the stream until it completes
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get response cache and concept search cache statistics"""
+    if semantic_cache:
+        semantic_stats = {"enabled": True, **await asyncio.to_thread(semantic_cache.get_stats)}
+    else:
+        semantic_stats = {"enabled": False}
+    
+    redis_stats = {"enabled": True, **redis_cache.get_stats()} if redis_cache else {"enabled": False}
+    
+    lookups = search_cache_stats['hits'] + search_cache_stats['misses']
+    return {
+        "redis": redis_stats,
+        "semantic": semantic_stats,
+        "search": {
+            **search_cache_stats,
+            "hit_rate": search_cache_stats['hits'] / lookups if lookups else 0.0,
+            "entries": len(search_cache)
+        }
+    }
+
 @app.get("/stats", response_model=SystemStatsResponse)
 async def get_system_stats():
     """Get system statistics"""
     if not chatbot:
         raise HTTPException(status_code=503, detail="Chatbot not available")
     
-    stats = chatbot.get_system_stats()
+    stats = await asyncio.to_thread(chatbot.get_system_stats)
     return SystemStatsResponse(**stats)
 
 @app.get("/pdfs", response_model=List[PDFInfoResponse])
@@ -184,7 +420,7 @@ async def get_loaded_pdfs():
     if not chatbot:
         raise HTTPException(status_code=503, detail="Chatbot not available")
     
-    pdf_info = chatbot.get_loaded_pdfs_info()
+    pdf_info = await asyncio.to_thread(chatbot.get_loaded_pdfs_info)
     return [PDFInfoResponse(**info) for info in pdf_info]
 
 @app.post("/upload-pdf", response_model=UploadResponse)
@@ -196,18 +432,30 @@ async def upload_pdf(file: UploadFile = File(...)):
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="File must be a PDF")
     
+    max_bytes = Config.MAX_PDF_SIZE_MB * 1024 * 1024
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix='.pdf')
+    os.close(tmp_fd)
+    
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_path = tmp_file.name
-        
-        # Process PDF
-        result = chatbot.load_pdf(tmp_path)
+        # Stream the upload to a temporary file in 1MB chunks
+        size = 0
+        async with aiofiles.open(tmp_path, 'wb') as tmp_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large (limit {Config.MAX_PDF_SIZE_MB}MB)"
+                    )
+                await tmp_file.write(chunk)
         
-        # Clean up temporary file
-        os.unlink(tmp_path)
+        # Process PDF without blocking the event loop
+        if pdf_parse_pool:
+            pdf_data = await asyncio.get_running_loop().run_in_executor(pdf_parse_pool, read_pdf_file, tmp_path)
+            result = await asyncio.to_thread(chatbot.load_pdf_data, tmp_path, pdf_data)
+        else:
+            result = await asyncio.to_thread(chatbot.load_pdf, tmp_path)
+        search_cache.clear()
         
         if result['success']:
             return UploadResponse(
@@ -227,6 +475,8 @@ async def upload_pdf(file: UploadFile = File(...)):
                 error=result.get('error', 'Unknown error')
             )
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"PDF upload error: {e}")
         return UploadResponse(
@@ -237,6 +487,9 @@ async def upload_pdf(file: UploadFile = File(...)):
             concepts_found=0,
             error=str(e)
         )
+    finally:
+        # Clean up temporary file
+        os.unlink(tmp_path)
 
 @app.get("/search-concepts")
 async def search_concepts(query: str):
@@ -245,18 +498,25 @@ async def search_concepts(query: str):
         raise HTTPException(status_code=503, detail="Chatbot not available")
     
     try:
-        results = chatbot.search_knowledge_base(query)
-        return {
-            "success": True,
-            "results": [
+        key = query.lower()
+        results = search_cache.get(key)
+        
+        if results is None:
+            search_cache_stats['misses'] += 1
+            matches = await asyncio.to_thread(chatbot.search_knowledge_base, query)
+            results = [
                 {
                     "concept": result['concept'],
                     "definition": result['data']['definition'],
                     "key_points": result['data']['key_points']
                 }
-                for result in results
+                for result in matches
             ]
-        }
+            search_cache[key] = results
+        else:
+            search_cache_stats['hits'] += 1
+        
+        return {"success": True, "results": results}
     except Exception as e:
         logger.error(f"Concept search error: {e}")
         return {"success": False, "error": str(e), "results": []}
@@ -268,7 +528,7 @@ async def get_random_quote():
         raise HTTPException(status_code=503, detail="Chatbot not available")
     
     try:
-        quote = chatbot.get_random_quote()
+        quote = await asyncio.to_thread(chatbot.get_random_quote)
         return {"success": True, "quote": quote}
     except Exception as e:
         logger.error(f"Quote generation error: {e}")
@@ -281,7 +541,8 @@ async def add_custom_quote(quote: str = Form(...)):
         raise HTTPException(status_code=503, detail="Chatbot not available")
     
     try:
-        chatbot.add_custom_quote(quote)
+        await asyncio.to_thread(chatbot.add_custom_quote, quote)
+        search_cache.clear()
         return {"success": True, "message": "Quote added successfully"}
     except Exception as e:
         logger.error(f"Add quote error: {e}")
@@ -300,7 +561,8 @@ async def add_custom_concept(
     try:
         # Parse key points (comma-separated)
         points = [point.strip() for point in key_points.split(',') if point.strip()]
-        chatbot.add_custom_concept(concept_name, definition, points)
+        await asyncio.to_thread(chatbot.add_custom_concept, concept_name, definition, points)
+        search_cache.clear()
         return {"success": True, "message": "Concept added successfully"}
     except Exception as e:
         logger.error(f"Add concept error: {e}")
@@ -313,7 +575,7 @@ async def clear_conversation_memory():
         raise HTTPException(status_code=503, detail="Chatbot not available")
     
     try:
-        chatbot.clear_memory()
+        await asyncio.to_thread(chatbot.clear_memory)
         return {"success": True, "message": "Memory cleared successfully"}
     except Exception as e:
         logger.error(f"Clear memory error: {e}")
@@ -327,10 +589,31 @@ if __name__ == "__main__":
     # Print configuration
     Config.print_config()
     
+    if Config.API_WORKERS > 1 and not sys.platform.startswith("win"):
+        # Hand over to gunicorn so each worker builds its own chatbot after the fork
+        os.chdir(Path(__file__).parent.parent)
+        os.execvp("gunicorn", [
+            "gunicorn", "api.main:app",
+            "-k", "uvicorn.workers.UvicornWorker",
+            "-w", str(Config.API_WORKERS),
+            "--max-requests", "2000",
+            "--max-requests-jitter", "200",
+            "--timeout", "120",
+            "--graceful-timeout", "30",
+            "--bind", f"{Config.API_HOST}:{Config.API_PORT}"
+        ])
+    
+    # uvloop is not available on Windows
+    loop = "asyncio" if sys.platform.startswith("win") else "uvloop"
+    
     # Start the server
     uvicorn.run(
         app, 
         host=Config.API_HOST, 
         port=Config.API_PORT,
-        log_level=Config.LOG_LEVEL.lower()
-    ) 
\ No newline at end of file
+        log_level=Config.LOG_LEVEL.lower(),
+        loop=loop,
+        http="httptools",
+        limit_concurrency=Config.LIMIT_CONCURRENCY,
+        timeout_keep_alive=Config.TIMEOUT_KEEP_ALIVE
+    )
\ No newline at end of file
@@ -7,10 +7,6 @@ import streamlit as st
 import os
 import tempfile
 from pathlib import Path
-import sys
-
-# Add src to path
-sys.path.append(str(Path(__file__).parent / "src"))
 
 from src.soros_chatbot import SorosChatbot
 from src.pdf_reader import PDFReader
@@ -110,25 +106,28 @@ def main():
         )
         
         if uploaded_files:
-            for uploaded_file in uploaded_files:
-                with st.spinner(f"Processing {uploaded_file.name}..."):
-                    # Save uploaded file temporarily
+            with st.spinner(f"Processing {len(uploaded_files)} PDF(s)..."):
+                # Save uploaded files temporarily
+                tmp_paths = []
+                for uploaded_file in uploaded_files:
                     with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
                         tmp_file.write(uploaded_file.getvalue())
-                        tmp_path = tmp_file.name
+                        tmp_paths.append(tmp_file.name)
+                
+                try:
+                    # Load all PDFs in one batch
+                    results = chatbot.load_pdfs_batch(tmp_paths)
                     
-                    try:
-                        # Load PDF
-                        result = chatbot.load_pdf(tmp_path)
-                        
+                    for uploaded_file, result in zip(uploaded_files, results):
                         if result['success']:
                             st.success(f"✅ {uploaded_file.name} loaded successfully!")
                             st.info(f"Extracted {len(result['extracted_content']['quotes'])} quotes")
                         else:
                             st.error(f"❌ Failed to load {uploaded_file.name}")
-                    
-                    finally:
-                        # Clean up temporary file
+                
+                finally:
+                    # Clean up temporary files
+                    for tmp_path in tmp_paths:
                         os.unlink(tmp_path)
         
         st.divider()
@@ -3,19 +3,14 @@ Soros Chatbot Command Line Interface
 Simple CLI for testing the chatbot without web dependencies
 """
 
-import os
-import sys
 from pathlib import Path
 
-# Add src to path
-sys.path.append(str(Path(__file__).parent / "src"))
-
 # Import configuration
-sys.path.append(str(Path(__file__).parent))
 from config import Config, create_env_file
 
 from src.soros_chatbot import SorosChatbot
 from src.pdf_reader import PDFReader
+from src.semantic_cache import SemanticCache
 from src.soros_knowledge_base import SorosKnowledgeBase
 
 
@@ -41,9 +36,24 @@ def main():
     try:
         # Initialize chatbot
         print("🔄 Initializing Soros Chatbot...")
+        semantic_cache = None
+        if Config.SEMANTIC_CACHE_ENABLED:
+            # Shares the API's cache file, so answers given by either are reused by both
+            try:
+                semantic_cache = SemanticCache(
+                    db_path=Config.CACHE_DIR / "semantic_cache.db",
+                    model_name=Config.EMBEDDING_MODEL,
+                    threshold=Config.SEMANTIC_CACHE_THRESHOLD,
+                    ttl_seconds=Config.SEMANTIC_CACHE_TTL_SECONDS,
+                    max_entries=Config.SEMANTIC_CACHE_MAX_ENTRIES
+                )
+            except Exception as e:
+                print(f"⚠️  Semantic cache disabled: {e}")
+        
         chatbot = SorosChatbot(
             api_key=Config.OPENAI_API_KEY,
-            model=Config.OPENAI_MODEL
+            model=Config.OPENAI_MODEL,
+            semantic_cache=semantic_cache
         )
         print("✅ Chatbot initialized successfully!")
         
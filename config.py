@@ -4,7 +4,9 @@ Loads settings from environment variables and .env file
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -25,6 +27,10 @@ class Config:
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "8000"))
     FRONTEND_PORT = int(os.getenv("FRONTEND_PORT", "3000"))
+    API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+    LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "1000"))
+    TIMEOUT_KEEP_ALIVE = int(os.getenv("TIMEOUT_KEEP_ALIVE", "30"))
+    THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "40"))
     
     # Development Settings
     DEBUG = os.getenv("DEBUG", "true").lower() == "true"
@@ -42,6 +48,21 @@ class Config:
     MAX_PDF_SIZE_MB = int(os.getenv("MAX_PDF_SIZE_MB", "50"))
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "1000"))
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
+    PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", "2"))
+    
+    # Cache Settings
+    CACHE_DIR = DATA_DIR / "cache"
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+    SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1024"))
+    SEARCH_CACHE_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "600"))
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    REDIS_URL = os.getenv("REDIS_URL", "")
+    
+    # Semantic Concept Search Settings
+    SEMANTIC_SEARCH_ENABLED = os.getenv("SEMANTIC_SEARCH_ENABLED", "true").lower() == "true"
     
     @classmethod
     def validate(cls):
@@ -64,7 +85,8 @@ class Config:
             cls.PDF_DIR,
             cls.PDF_PROCESSED_DIR,
             cls.PDF_UPLOADS_DIR,
-            cls.PDF_ARCHIVE_DIR
+            cls.PDF_ARCHIVE_DIR,
+            cls.CACHE_DIR
         ]
         
         for directory in directories:
@@ -72,6 +94,21 @@ class Config:
         
         return True
     
+    @classmethod
+    @lru_cache(maxsize=None)
+    def public_settings(cls) -> Dict:
+        """Get the non-sensitive settings exposed by the API (built once, do not mutate)"""
+        return {
+            "model": cls.OPENAI_MODEL,
+            "temperature": cls.OPENAI_TEMPERATURE,
+            "max_tokens": cls.OPENAI_MAX_TOKENS,
+            "api_host": cls.API_HOST,
+            "api_port": cls.API_PORT,
+            "frontend_port": cls.FRONTEND_PORT,
+            "debug": cls.DEBUG,
+            "log_level": cls.LOG_LEVEL
+        }
+    
     @classmethod
     def print_config(cls):
         """Print current configuration (without sensitive data)"""
@@ -81,6 +118,7 @@ class Config:
         print(f"   Max Tokens: {cls.OPENAI_MAX_TOKENS}")
         print(f"   API Host: {cls.API_HOST}")
         print(f"   API Port: {cls.API_PORT}")
+        print(f"   API Workers: {cls.API_WORKERS}")
         print(f"   Frontend Port: {cls.FRONTEND_PORT}")
         print(f"   Debug Mode: {cls.DEBUG}")
         print(f"   Log Level: {cls.LOG_LEVEL}")
@@ -89,6 +127,8 @@ class Config:
         print(f"   Max PDF Size: {cls.MAX_PDF_SIZE_MB}MB")
         print(f"   Chunk Size: {cls.CHUNK_SIZE}")
         print(f"   Chunk Overlap: {cls.CHUNK_OVERLAP}")
+        print(f"   Semantic Cache: {'Enabled' if cls.SEMANTIC_CACHE_ENABLED else 'Disabled'} (threshold {cls.SEMANTIC_CACHE_THRESHOLD})")
+        print(f"   Shared Redis Cache: {'Enabled' if cls.REDIS_URL else 'Disabled'}")
 
 # Create .env file if it doesn't exist
 def create_env_file():
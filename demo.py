@@ -3,14 +3,9 @@ Soros Chatbot Demo
 Demonstrates the capabilities without requiring an API key
 """
 
-import sys
 from pathlib import Path
 
-# Add src to path
-sys.path.append(str(Path(__file__).parent / "src"))
-
 # Import configuration
-sys.path.append(str(Path(__file__).parent))
 from config import Config, create_env_file
 
 def main():
@@ -121,7 +116,7 @@ def main():
     print()
     print("3. Or start components individually:")
     print("   # Backend only")
-    print("   python api/main.py")
+    print("   python -m api.main")
     print()
     print("   # Frontend only")
     print("   cd frontend && npm start")
@@ -3,14 +3,67 @@ Example usage of the Soros Chatbot
 Demonstrates basic functionality without requiring PDF uploads
 """
 
+import json
 import os
-import sys
-from pathlib import Path
+import time
 
-# Add src to path
-sys.path.append(str(Path(__file__).parent / "src"))
+# Batch states after which no more results will arrive
+BATCH_FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
 
-def main():
+def run_batch(chatbot, questions, api_key, poll_seconds=10):
+    """Answer independent questions through one OpenAI Batch API job, in question order"""
+    from openai import OpenAI
+    
+    client = OpenAI(api_key=api_key)
+    
+    # Each request carries the same system prompt and knowledge-base context as chatbot.chat(),
+    # but no conversation history, since batched requests cannot see each other's answers
+    lines = []
+    for i, question in enumerate(questions):
+        lines.append(json.dumps({
+            "custom_id": f"question-{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": chatbot.llm.model_name,
+                "temperature": 0.7,
+                "max_tokens": 1000,
+                "messages": [
+                    {"role": "system", "content": chatbot.system_prompt},
+                    {"role": "system", "content": chatbot.knowledge_base.generate_turn_context(question)},
+                    {"role": "user", "content": question}
+                ]
+            }
+        }))
+    
+    batch_file = client.files.create(
+        file=("example_batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"📦 Submitted batch {batch.id} with {len(questions)} requests")
+    
+    while batch.status not in BATCH_FINAL_STATES:
+        time.sleep(poll_seconds)
+        batch = client.batches.retrieve(batch.id)
+        print(f"   Status: {batch.status}")
+    
+    # Results come back in any order, so they are matched to questions by custom_id
+    responses = {}
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            result = json.loads(line)
+            body = (result.get("response") or {}).get("body") or {}
+            if body.get("choices"):
+                responses[result["custom_id"]] = body["choices"][0]["message"]["content"]
+    
+    return [responses.get(f"question-{i}", f"(no response: batch {batch.status})") for i in range(len(questions))]
+
+def main(batch=False):
     """Example usage of the Soros chatbot"""
     
     # Check for API key
@@ -42,10 +95,16 @@ def main():
             "What is an open society?"
         ]
         
-        for question in questions:
+        if batch:
+            # Half the cost of live calls; results arrive once the whole batch completes
+            responses = run_batch(chatbot, questions, api_key)
+        else:
+            responses = None
+        
+        for i, question in enumerate(questions):
             print(f"\n🤔 Question: {question}")
             print("🤖 Soros Response:")
-            response = chatbot.chat(question)
+            response = responses[i] if responses else chatbot.chat(question)
             print(f"   {response}")
             print("-" * 40)
         
@@ -124,4 +183,10 @@ def main():
         print("Please check your API key and internet connection.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Soros Chatbot examples")
+    parser.add_argument("--batch", action="store_true", help="Answer the example questions through the OpenAI Batch API")
+    
+    args = parser.parse_args()
+    main(batch=args.batch)
\ No newline at end of file
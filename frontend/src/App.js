@@ -107,23 +107,71 @@ function App() {
     setIsTyping(true);
 
     try {
-      const response = await axios.post(`${API_BASE_URL}/chat`, {
-        message: inputMessage,
-        use_context: true
+      // Stream the answer as Server-Sent Events so text appears as it is generated
+      const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          message: inputMessage,
+          use_context: true
+        })
       });
 
-      if (response.data.success) {
-        const sorosMessage = {
-          id: Date.now() + 1,
-          type: 'soros',
-          content: response.data.response,
-          timestamp: new Date().toISOString()
-        };
-
-        setMessages(prev => [...prev, sorosMessage]);
-        await loadStats(); // Refresh stats after message
-      } else {
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+
+      const sorosMessageId = Date.now() + 1;
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let started = false;
+      let failed = false;
+
+      const appendDelta = (delta) => {
+        if (!started) {
+          // Replace the typing indicator with the message being streamed
+          started = true;
+          setIsTyping(false);
+          setMessages(prev => [...prev, {
+            id: sorosMessageId,
+            type: 'soros',
+            content: delta,
+            timestamp: new Date().toISOString()
+          }]);
+        } else {
+          setMessages(prev => prev.map(message =>
+            message.id === sorosMessageId
+              ? { ...message, content: message.content + delta }
+              : message
+          ));
+        }
+      };
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+
+        for (const event of events) {
+          if (!event.startsWith('data: ')) continue;
+          const payload = JSON.parse(event.slice(6));
+
+          if (payload.delta) {
+            appendDelta(payload.delta);
+          } else if (payload.error) {
+            failed = true;
+          }
+        }
+      }
+
+      if (failed) {
         toast.error('Failed to get response from Soros');
+      } else {
+        await loadStats(); // Refresh stats after message
       }
     } catch (error) {
       console.error('Chat error:', error);
@@ -4,63 +4,52 @@ PDF Management Script for Soros Chatbot
 Helps organize and process PDF files
 """
 
-import os
 import shutil
 from pathlib import Path
 import sys
 
-# Add src to path
-sys.path.append(str(Path(__file__).parent / "src"))
-
 # Import configuration
-sys.path.append(str(Path(__file__).parent))
 from config import Config
+from src.pdf_reader import iter_pdfs
+
+# Size limit in bytes, so file sizes are compared as integers straight from stat()
+_MAX_BYTES = int(Config.MAX_PDF_SIZE_MB) * (1 << 20)
+
+def _scan_pdfs(directory):
+    """Get (name, size in bytes) for each PDF in a directory from a single scandir pass"""
+    # DirEntry.stat() reuses the information scandir already fetched where the OS provides it
+    return [(entry.name, entry.stat().st_size) for entry in iter_pdfs(directory)]
 
 def list_pdfs():
     """List all PDFs in the system"""
     print("📚 PDF Files in Soros Chatbot")
     print("=" * 50)
     
-    # Main PDF directory
-    main_pdfs = list(Config.PDF_DIR.glob("*.pdf"))
-    if main_pdfs:
-        print(f"\n📁 Main Directory ({Config.PDF_DIR}):")
-        for pdf in main_pdfs:
-            size_mb = pdf.stat().st_size / (1024 * 1024)
-            print(f"   📄 {pdf.name} ({size_mb:.1f}MB)")
-    
-    # Processed directory
-    processed_pdfs = list(Config.PDF_PROCESSED_DIR.glob("*.pdf"))
-    if processed_pdfs:
-        print(f"\n✅ Processed Directory ({Config.PDF_PROCESSED_DIR}):")
-        for pdf in processed_pdfs:
-            size_mb = pdf.stat().st_size / (1024 * 1024)
-            print(f"   📄 {pdf.name} ({size_mb:.1f}MB)")
-    
-    # Uploads directory
-    upload_pdfs = list(Config.PDF_UPLOADS_DIR.glob("*.pdf"))
-    if upload_pdfs:
-        print(f"\n📤 Uploads Directory ({Config.PDF_UPLOADS_DIR}):")
-        for pdf in upload_pdfs:
-            size_mb = pdf.stat().st_size / (1024 * 1024)
-            print(f"   📄 {pdf.name} ({size_mb:.1f}MB)")
-    
-    # Archive directory
-    archive_pdfs = list(Config.PDF_ARCHIVE_DIR.glob("*.pdf"))
-    if archive_pdfs:
-        print(f"\n🗄️  Archive Directory ({Config.PDF_ARCHIVE_DIR}):")
-        for pdf in archive_pdfs:
-            size_mb = pdf.stat().st_size / (1024 * 1024)
-            print(f"   📄 {pdf.name} ({size_mb:.1f}MB)")
-    
-    total_pdfs = len(main_pdfs) + len(processed_pdfs) + len(upload_pdfs) + len(archive_pdfs)
+    directories = [
+        ("📁 Main Directory", Config.PDF_DIR),
+        ("✅ Processed Directory", Config.PDF_PROCESSED_DIR),
+        ("📤 Uploads Directory", Config.PDF_UPLOADS_DIR),
+        ("🗄️  Archive Directory", Config.PDF_ARCHIVE_DIR)
+    ]
+    listings = [(title, directory, _scan_pdfs(directory)) for title, directory in directories]
+    
+    for title, directory, pdfs in listings:
+        if pdfs:
+            print(f"\n{title} ({directory}):")
+            for name, size in pdfs:
+                print(f"   📄 {name} ({size / (1024 * 1024):.1f}MB)")
+    
+    total_pdfs = sum(len(pdfs) for _, _, pdfs in listings)
     print(f"\n📊 Total PDFs: {total_pdfs}")
 
 def add_pdf(pdf_path):
     """Add a PDF to the main directory"""
     pdf_path = Path(pdf_path)
     
-    if not pdf_path.exists():
+    # One stat() answers both whether the file exists and how large it is
+    try:
+        size = pdf_path.stat().st_size
+    except FileNotFoundError:
         print(f"❌ Error: File {pdf_path} does not exist")
         return False
     
@@ -69,9 +58,8 @@ def add_pdf(pdf_path):
         return False
     
     # Check file size
-    size_mb = pdf_path.stat().st_size / (1024 * 1024)
-    if size_mb > Config.MAX_PDF_SIZE_MB:
-        print(f"❌ Error: File too large ({size_mb:.1f}MB > {Config.MAX_PDF_SIZE_MB}MB)")
+    if size > _MAX_BYTES:
+        print(f"❌ Error: File too large ({size / (1 << 20):.1f}MB > {Config.MAX_PDF_SIZE_MB}MB)")
         return False
     
     # Copy to main PDF directory
@@ -85,9 +73,10 @@ def add_pdf(pdf_path):
         counter += 1
     
     try:
-        shutil.copy2(pdf_path, dest_path)
+        # Only the bytes matter; copyfile uses the kernel's zero-copy path (sendfile) on Linux
+        shutil.copyfile(pdf_path, dest_path)
         print(f"✅ Added {pdf_path.name} to {Config.PDF_DIR}")
-        print(f"   Size: {size_mb:.1f}MB")
+        print(f"   Size: {size / (1 << 20):.1f}MB")
         return True
     except Exception as e:
         print(f"❌ Error copying file: {e}")
@@ -133,7 +122,7 @@ def move_pdf(pdf_name, destination):
 
 def clean_uploads():
     """Clean up temporary upload files"""
-    upload_files = list(Config.PDF_UPLOADS_DIR.glob("*.pdf"))
+    upload_files = [Path(entry.path) for entry in iter_pdfs(Config.PDF_UPLOADS_DIR)]
     
     if not upload_files:
         print("📤 No files in uploads directory to clean")
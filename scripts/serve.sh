@@ -0,0 +1,37 @@
+#!/bin/bash
+
+# Soros Chatbot Production Server
+# Runs the FastAPI backend under gunicorn with one Uvicorn worker per CPU
+
+cd "$(dirname "$0")/.."
+
+# Load server settings from .env if present
+if [ -f ".env" ]; then
+    set -a
+    . ./.env
+    set +a
+fi
+
+API_HOST=${API_HOST:-0.0.0.0}
+API_PORT=${API_PORT:-8000}
+API_WORKERS=${API_WORKERS:-$(nproc)}
+
+case "$(uname -s)" in
+    MINGW*|MSYS*|CYGWIN*)
+        # gunicorn does not run on Windows
+        echo "⚠️  gunicorn is not supported on Windows, falling back to uvicorn"
+        exec python -m api.main
+        ;;
+esac
+
+echo "🚀 Starting Soros Chatbot API on http://${API_HOST}:${API_PORT} with ${API_WORKERS} workers"
+
+# Each worker builds its own chatbot in the lifespan handler, after the fork
+exec gunicorn api.main:app \
+    -k uvicorn.workers.UvicornWorker \
+    -w "${API_WORKERS}" \
+    --max-requests 2000 \
+    --max-requests-jitter 200 \
+    --timeout 120 \
+    --graceful-timeout 30 \
+    --bind "${API_HOST}:${API_PORT}"
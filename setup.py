@@ -18,7 +18,8 @@ setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/yourusername/soros-chatbot",
-    packages=find_packages(),
+    packages=find_packages(include=["src", "api"]),
+    py_modules=["cli", "config"],
     classifiers=[
         "Development Status :: 4 - Beta",
         "Intended Audience :: Developers",
@@ -26,28 +27,26 @@ setup(
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
         "Topic :: Scientific/Engineering :: Artificial Intelligence",
         "Topic :: Text Processing :: Linguistic",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.9",
     install_requires=[
         "openai>=1.3.0",
-        "langchain>=0.0.350",
-        "langchain-openai>=0.0.2",
-        "langchain-community>=0.0.10",
+        "langchain>=0.2.0",
+        "langchain-core>=0.2.2",
+        "langchain-openai>=0.1.8",
+        "langchain-community>=0.2.0",
+        "httpx[http2]>=0.25.0",
         "transformers>=4.35.2",
         "torch>=2.1.1",
         "accelerate>=0.24.1",
-        "PyPDF2>=3.0.1",
         "pdfplumber>=0.10.2",
         "pymupdf>=1.23.8",
         "nltk>=3.8.1",
-        "spacy>=3.7.2",
-        "textract>=1.6.5",
         "streamlit>=1.28.1",
         "gradio>=4.0.2",
         "pandas>=2.1.3",
@@ -55,8 +54,10 @@ setup(
         "scikit-learn>=1.3.2",
         "python-dotenv>=1.0.0",
         "requests>=2.31.0",
+        "orjson>=3.9.10",
         "beautifulsoup4>=4.12.2",
         "tiktoken>=0.5.1",
+        "sentence-transformers>=2.2.2",
     ],
     extras_require={
         "dev": [
@@ -0,0 +1,150 @@
+"""
+Concept Index Module for Soros Chatbot
+Embedding similarity search over knowledge base concepts
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from .embeddings import embed_query, encode, quantize_int8
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def concept_text(concept_name: str, concept_data: Dict) -> str:
+    """Text embedded for a concept: its name, definition and key points"""
+    name = concept_name.replace('_', ' ')
+    return f"{name}: {concept_data['definition']} {' '.join(concept_data['key_points'])}"
+
+
+def text_digest(text: str) -> str:
+    """Key under which a text's embedding is persisted"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ConceptIndex:
+    """Dense matrix of concept embeddings, persisted next to the knowledge base"""
+
+    def __init__(self, index_dir: str, model_name: str, threshold: float = 0.45):
+        self.index_dir = Path(index_dir)
+        self.matrix_path = self.index_dir / "concepts.npz"
+        self.labels_path = self.index_dir / "concepts_index.json"
+        self.model_name = model_name
+        self.threshold = threshold
+
+        self.names: List[str] = []
+        # Digest of the text each row was embedded from, so unchanged concepts are never re-embedded
+        self.digests: List[str] = []
+        # One L2-normalised row per concept, kept as int8 with a float32 scale per row, a quarter of the
+        # float32 footprint; the dequantized matrix-vector product gives cosine similarities
+        self.matrix = np.zeros((0, 0), dtype=np.int8)
+        self.scales = np.zeros(0, dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def build(self, concepts: Dict[str, Dict]):
+        """Reuse persisted rows for unchanged concepts and embed the rest in one batch"""
+        names = list(concepts)
+        texts = [concept_text(name, concepts[name]) for name in names]
+        digests = [text_digest(text) for text in texts]
+
+        with self._lock:
+            saved_digests, saved_matrix, saved_scales = self._load()
+            if saved_digests == digests:
+                self.matrix, self.scales = saved_matrix, saved_scales
+                self.names, self.digests = names, digests
+                logger.info(f"Loaded concept index with {len(names)} concepts")
+                return
+
+            saved_rows = {digest: i for i, digest in enumerate(saved_digests)}
+            reused = [i for i, digest in enumerate(digests) if digest in saved_rows]
+            missing = [i for i, digest in enumerate(digests) if digest not in saved_rows]
+
+            # A single encode call for everything new or edited, batched inside the model
+            if missing:
+                new_matrix, new_scales = quantize_int8(encode([texts[i] for i in missing], self.model_name))
+            else:
+                new_matrix, new_scales = saved_matrix[:0], saved_scales[:0]
+
+            matrix = np.zeros((len(names), new_matrix.shape[1]), dtype=np.int8)
+            scales = np.zeros(len(names), dtype=np.float32)
+            matrix[missing], scales[missing] = new_matrix, new_scales
+            if reused:
+                rows = [saved_rows[digests[i]] for i in reused]
+                matrix[reused], scales[reused] = saved_matrix[rows], saved_scales[rows]
+
+            self.matrix, self.scales = matrix, scales
+            self.names, self.digests = names, digests
+            self._save()
+            logger.info(f"Built concept index with {len(names)} concepts, {len(missing)} newly embedded")
+
+    def add(self, concept_name: str, concept_data: Dict):
+        """Add a concept, or re-embed it if it is already indexed"""
+        text = concept_text(concept_name, concept_data)
+        row, scale = quantize_int8(encode([text], self.model_name))
+
+        with self._lock:
+            if concept_name in self.names:
+                i = self.names.index(concept_name)
+                self.matrix[i], self.scales[i] = row[0], scale[0]
+                self.digests[i] = text_digest(text)
+            else:
+                self.names.append(concept_name)
+                self.digests.append(text_digest(text))
+                self.matrix = np.vstack([self.matrix.reshape(-1, row.shape[1]), row])
+                self.scales = np.concatenate([self.scales, scale])
+            self._save()
+
+    def search(self, query: str, k: int = 10) -> List[str]:
+        """Get names of the concepts most similar to the query, above the threshold"""
+        vector = embed_query(query, self.model_name)
+
+        with self._lock:
+            k = min(k, len(self.names))
+            if not k:
+                return []
+
+            # Exact search: for a knowledge base's worth of concepts one GEMV beats any ANN structure
+            similarities = (self.matrix.astype(np.float32) @ vector) * self.scales
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top = top[np.argsort(-similarities[top])]
+
+            return [self.names[i] for i in top if similarities[i] >= self.threshold]
+
+    def _load(self) -> tuple:
+        """Persisted (digests, int8 matrix, scales) if built with the same model, otherwise empty"""
+        empty = ([], np.zeros((0, 0), dtype=np.int8), np.zeros(0, dtype=np.float32))
+        if not (self.matrix_path.exists() and self.labels_path.exists()):
+            return empty
+
+        try:
+            with open(self.labels_path, 'r', encoding='utf-8') as f:
+                labels = json.load(f)
+            digests = labels.get('digests', [])
+            if labels.get('model') != self.model_name or not digests:
+                return empty
+
+            with np.load(self.matrix_path) as saved:
+                matrix, scales = saved['matrix'], saved['scales']
+            if matrix.dtype != np.int8 or matrix.shape[0] != len(digests) or scales.shape != (len(digests),):
+                return empty
+
+            return digests, matrix, scales.astype(np.float32, copy=False)
+        except Exception as e:
+            logger.warning(f"Failed to load concept index, rebuilding: {e}")
+            return empty
+
+    def _save(self):
+        """Persist the matrix, its row scales and its row-to-concept mapping"""
+        try:
+            np.savez(self.matrix_path, matrix=self.matrix, scales=self.scales)
+            with open(self.labels_path, 'w', encoding='utf-8') as f:
+                json.dump({'model': self.model_name, 'names': self.names, 'digests': self.digests}, f)
+        except Exception as e:
+            logger.error(f"Failed to save concept index: {e}")
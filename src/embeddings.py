@@ -0,0 +1,73 @@
+"""
+Embeddings Module for Soros Chatbot
+Loads sentence embedding models once per process and shares them between components
+"""
+
+import logging
+import threading
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Texts per forward pass when encoding many at once, e.g. every concept at startup
+ENCODE_BATCH_SIZE = 64
+
+_encoders: Dict = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(model_name: str):
+    """Get a loaded SentenceTransformer, loading it on first use"""
+    with _encoders_lock:
+        if model_name not in _encoders:
+            # Imported here so the dependency is only needed when embeddings are enabled
+            from sentence_transformers import SentenceTransformer
+            _encoders[model_name] = SentenceTransformer(model_name)
+            logger.info(f"Loaded embedding model: {model_name}")
+        return _encoders[model_name]
+
+
+def encode(texts: List[str], model_name: str) -> np.ndarray:
+    """Encode texts as a (len(texts), dim) matrix of L2-normalised float32 rows"""
+    vectors = get_encoder(model_name).encode(
+        texts, batch_size=ENCODE_BATCH_SIZE, normalize_embeddings=True, convert_to_numpy=True
+    )
+    return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase a question and collapse its whitespace"""
+    return " ".join(text.lower().split())
+
+
+@lru_cache(maxsize=2048)
+def _embed(text: str, model_name: str) -> np.ndarray:
+    """Encode one text; results are shared read-only, so callers must not modify them"""
+    vector = encode([text], model_name)[0]
+    vector.setflags(write=False)
+    return vector
+
+
+def embed_query(text: str, model_name: str) -> np.ndarray:
+    """Embed a user query, reusing the vector of any query that normalises the same way"""
+    # Embeddings are deterministic for a fixed model, so a question repeated across turns,
+    # or looked up by both the response cache and concept search, is only encoded once
+    return _embed(normalize_query(text), model_name)
+
+
+def embedding_cache_info():
+    """Hit/miss counters of the shared query embedding cache"""
+    return _embed.cache_info()
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple:
+    """Symmetrically quantize each row to int8, returning (int8 rows, float32 row scales)"""
+    vectors = np.atleast_2d(vectors)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
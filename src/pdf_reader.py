@@ -3,190 +3,641 @@ PDF Reader Module for Soros Chatbot
 Handles PDF text extraction and preprocessing
 """
 
+import atexit
+import hashlib
+import io
+import itertools
+import json
 import os
 import logging
-from typing import List, Dict, Optional
-import PyPDF2
-import pdfplumber
-import fitz  # PyMuPDF
+import multiprocessing
+import pickle
+import queue
+import sqlite3
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator, List, Dict, Optional, Tuple
 import re
 from pathlib import Path
 
+# The PDF parsers take a few hundred milliseconds to import, so they are imported where
+# they are used; tools that only list files (e.g. manage_pdfs.py) never load them
+if TYPE_CHECKING:
+    import fitz  # PyMuPDF
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Neither pattern has nested quantifiers, so the stdlib engine already runs in linear time.
+# RE2 was measured ~3x slower on extracted text and its ASCII-only \w drops non-English letters.
+
+# Lines holding nothing but a page number
+_PAGE_NUMBER_RE = re.compile(r'^\d+\s*$', re.MULTILINE)
+
+# Anything other than word characters, whitespace and common punctuation is a PDF artifact
+_ARTIFACT_RE = re.compile(r'[^\w\s.,!?;:\-()\[\]{}"\']+')
+
+# Cache location inside the project, independent of the working directory (Config.CACHE_DIR / "pdfs")
+_DEFAULT_CACHE_DIR = str(Path(__file__).resolve().parent.parent / "data" / "cache" / "pdfs")
+
+# Worker processes for splitting long documents by page, shared by every reader in the process
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+
+def iter_pdfs(directory) -> Iterator[os.DirEntry]:
+    """Yield the PDF files in a directory (any extension case) from a single scandir pass"""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith('.pdf') and entry.is_file():
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+def prefetch_pdfs(pdf_paths: List[str], depth: int = 2) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """Yield (path, file bytes) pairs, reading ahead in a background thread while the caller parses"""
+    # File reads release the GIL, so the next PDF comes off disk while the current one is parsed.
+    # Unreadable files yield None and are left for the parser to report.
+    buffer = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    
+    def produce():
+        for pdf_path in pdf_paths:
+            if stop.is_set():
+                return
+            try:
+                with open(pdf_path, 'rb') as file:
+                    data = file.read()
+            except OSError:
+                data = None
+            buffer.put((pdf_path, data))
+        buffer.put(None)
+    
+    producer = threading.Thread(target=produce, name="pdf-prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = buffer.get()
+            if item is None:
+                break
+            yield item
+    finally:
+        # Unblock a producer waiting on a full buffer if the caller stopped early
+        stop.set()
+        while producer.is_alive():
+            try:
+                buffer.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
+
+
+def _metadata_from_doc(doc: "fitz.Document") -> Dict:
+    """Read the document info dictionary and page count of an open PyMuPDF document"""
+    info = doc.metadata or {}
+    return {
+        'title': info.get('title', ''),
+        'author': info.get('author', ''),
+        'subject': info.get('subject', ''),
+        'creator': info.get('creator', ''),
+        'producer': info.get('producer', ''),
+        'pages': doc.page_count
+    }
+
+
+@lru_cache(maxsize=256)
+def _cached_file_metadata(pdf_path: str, mtime_ns: int, size: int) -> Dict:
+    """Metadata of a file on disk; the modification time and size in the key invalidate edited files"""
+    import fitz
+    
+    with fitz.open(pdf_path) as doc:
+        return _metadata_from_doc(doc)
+
+
+def _get_page_pool() -> ProcessPoolExecutor:
+    """The shared page-extraction pool, started on first use so its workers are paid for once"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            # Spawned, not forked: the caller may be a threaded server (uvicorn, Streamlit) or have the
+            # prefetch and quote-writer threads running, and forking a multithreaded process can deadlock
+            _page_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_page_pool.shutdown, cancel_futures=True)
+        return _page_pool
+
+
+def _discard_page_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died, so the next document starts a fresh one"""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is pool:
+            _page_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _is_temp_file(pdf_path: str) -> bool:
+    """Whether a file lives in the temp directory, e.g. an upload that is deleted after parsing"""
+    temp_dir = os.path.realpath(tempfile.gettempdir())
+    try:
+        return os.path.commonpath([os.path.realpath(pdf_path), temp_dir]) == temp_dir
+    except ValueError:
+        # On Windows a file on a different drive from the temp directory has no common path with it
+        return False
+
+
+def _extract_pdfplumber_pages(data: bytes, start: int, stop: int) -> List[Optional[str]]:
+    """Extract text from a range of pages with pdfplumber; runs in a worker process"""
+    import pdfplumber
+    
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return [page.extract_text() for page in pdf.pages[start:stop]]
+
+
+def _extract_pymupdf_pages(data: bytes, start: int, stop: int) -> List[str]:
+    """Extract text from a range of pages with PyMuPDF; runs in a worker process"""
+    import fitz
+    
+    with fitz.open(stream=data, filetype='pdf') as doc:
+        return [doc[number].get_text() for number in range(start, min(stop, doc.page_count))]
+
+
+def iter_chunk_slices(text: str, offsets: List[Tuple[int, int]]) -> Iterator[str]:
+    """Materialise chunks of a text from their (start, end) offsets, one at a time"""
+    for start, end in offsets:
+        yield text[start:end]
+
 
 class PDFReader:
     """Advanced PDF reader with multiple extraction methods"""
     
-    def __init__(self):
+    # Extraction output at least this long per page is accepted without trying slower parsers
+    MIN_CHARS_PER_PAGE = 200
+    
+    # Pages are split across processes only when each worker gets at least this many;
+    # PyMuPDF pages are far cheaper, so a split only pays off on much longer documents
+    PDFPLUMBER_PAGES_PER_WORKER = 8
+    PYMUPDF_PAGES_PER_WORKER = 64
+    
+    # Bump when extraction, cleaning or the result layout changes so stale cached results are ignored
+    CACHE_VERSION = 2
+    
+    # Least recently used cache entries are evicted once the cache grows past this size
+    CACHE_MAX_BYTES = 512 * (1 << 20)
+    
+    def __init__(self, cache_dir: Optional[str] = _DEFAULT_CACHE_DIR, store_path: str = ""):
+        # Summaries of read PDFs; their text and chunk offsets live in the SQLite store
         self.extracted_texts = []
         self.metadata = {}
+        
+        # Processed results are cached on disk by file content; None disables the cache
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        
+        # An empty store path gives a private temporary database on disk, removed on close
+        self.db = sqlite3.connect(store_path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        
+        # Version 1 keeps each text once and indexes chunks by offset; older stores held chunk copies
+        if self.db.execute("PRAGMA user_version").fetchone()[0] < 1:
+            self.db.execute("DROP TABLE IF EXISTS documents")
+            self.db.execute("DROP TABLE IF EXISTS chunks")
+            self.db.execute("PRAGMA user_version = 1")
+        
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                file_path TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                word_count INTEGER NOT NULL,
+                total_chunks INTEGER NOT NULL,
+                cleaned_text TEXT NOT NULL
+            )"""
+        )
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS chunk_offsets (
+                document_id INTEGER NOT NULL,
+                start INTEGER NOT NULL,
+                end INTEGER NOT NULL
+            )"""
+        )
+        # Contentless: the index keeps only terms, chunk text is sliced from documents by offset
+        self.db.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(chunk_text, content='')"
+        )
+        self.db.commit()
     
-    def extract_text_pypdf2(self, pdf_path: str) -> str:
-        """Extract text using PyPDF2"""
+    def extract_text_pdfplumber(self, pdf_path: str, data: Optional[bytes] = None) -> str:
+        """Extract text using pdfplumber, from the file contents if already read"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text
+            import pdfplumber
+            
+            if data is None:
+                with open(pdf_path, 'rb') as file:
+                    data = file.read()
+            
+            with pdfplumber.open(io.BytesIO(data)) as pdf:
+                page_count = len(pdf.pages)
+                workers = self._page_workers(page_count, self.PDFPLUMBER_PAGES_PER_WORKER)
+                if workers <= 1:
+                    page_texts = [page.extract_text() for page in pdf.pages]
+            
+            if workers > 1:
+                page_texts = self._extract_pages_parallel(_extract_pdfplumber_pages, data, page_count, workers)
+            
+            return "\n".join(text for text in page_texts if text)
         except Exception as e:
-            logger.error(f"PyPDF2 extraction failed: {e}")
+            logger.error(f"pdfplumber extraction failed: {e}")
             return ""
     
-    def extract_text_pdfplumber(self, pdf_path: str) -> str:
-        """Extract text using pdfplumber"""
+    def _page_workers(self, page_count: int, pages_per_worker: int) -> int:
+        """Number of processes to extract pages with (1 means in this process)"""
+        # Already inside a worker (e.g. read_multiple_pdfs or the API's parse pool): don't nest pools
+        if multiprocessing.parent_process() is not None:
+            return 1
+        return min(os.cpu_count() or 1, page_count // pages_per_worker)
+    
+    def _extract_pages_parallel(self, extract_pages, data: bytes, page_count: int, workers: int) -> List:
+        """Extract contiguous page ranges in worker processes, returning page texts in order"""
+        # Neither parser can use threads: pdfplumber is pure Python and PyMuPDF documents are not thread-safe
+        step = -(-page_count // workers)
+        pool = _get_page_pool()
         try:
-            text = ""
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            return text
-        except Exception as e:
-            logger.error(f"pdfplumber extraction failed: {e}")
-            return ""
+            futures = [
+                pool.submit(extract_pages, data, start, start + step)
+                for start in range(0, page_count, step)
+            ]
+            return [text for future in futures for text in future.result()]
+        except BrokenProcessPool:
+            _discard_page_pool(pool)
+            raise
     
-    def extract_text_pymupdf(self, pdf_path: str) -> str:
-        """Extract text using PyMuPDF"""
+    def extract_text_pymupdf(
+        self,
+        pdf_path: str,
+        doc: Optional["fitz.Document"] = None,
+        data: Optional[bytes] = None
+    ) -> str:
+        """Extract text using PyMuPDF, reusing an already opened document or read bytes if given"""
         try:
-            text = ""
-            doc = fitz.open(pdf_path)
-            for page in doc:
-                text += page.get_text() + "\n"
-            doc.close()
-            return text
+            import fitz
+            
+            owns_doc = doc is None
+            if owns_doc:
+                doc = fitz.open(stream=data, filetype='pdf') if data is not None else fitz.open(pdf_path)
+            
+            workers = self._page_workers(doc.page_count, self.PYMUPDF_PAGES_PER_WORKER)
+            if workers > 1 and data is not None:
+                page_texts = self._extract_pages_parallel(_extract_pymupdf_pages, data, doc.page_count, workers)
+            else:
+                page_texts = [page.get_text() for page in doc]
+            
+            if owns_doc:
+                doc.close()
+            return "\n".join(page_texts)
         except Exception as e:
             logger.error(f"PyMuPDF extraction failed: {e}")
             return ""
     
-    def extract_text_combined(self, pdf_path: str) -> str:
-        """Combine multiple extraction methods for best results"""
+    def extract_text_combined(self, pdf_path: str, data: Optional[bytes] = None) -> str:
+        """Try extraction methods fastest first, stopping once one returns a full document"""
+        return self._open_and_extract(pdf_path, data)[0]
+    
+    def _open_and_extract(self, pdf_path: str, data: Optional[bytes] = None) -> Tuple[str, Dict]:
+        """Extract text and metadata, opening the document with PyMuPDF only once"""
+        # Every parser works from one in-memory copy of the file
+        if data is None:
+            with open(pdf_path, 'rb') as file:
+                data = file.read()
+        
+        try:
+            import fitz
+            
+            doc = fitz.open(stream=data, filetype='pdf')
+        except Exception as e:
+            logger.warning(f"PyMuPDF could not open {pdf_path}: {e}")
+            doc = None
+        
+        # PyMuPDF parses metadata along with the document; a file it cannot open has none to offer
+        metadata = _metadata_from_doc(doc) if doc else {}
+        
+        # Without a page count, any non-empty result is accepted
+        expected_min = doc.page_count * self.MIN_CHARS_PER_PAGE if doc else 1
+        
         methods = [
-            self.extract_text_pymupdf,
-            self.extract_text_pdfplumber,
-            self.extract_text_pypdf2
+            lambda: self.extract_text_pymupdf(pdf_path, doc, data) if doc else "",
+            lambda: self.extract_text_pdfplumber(pdf_path, data)
         ]
         
         best_text = ""
-        for method in methods:
-            try:
-                text = method(pdf_path)
-                if len(text) > len(best_text):
-                    best_text = text
-            except Exception as e:
-                logger.warning(f"Method {method.__name__} failed: {e}")
-                continue
+        try:
+            for method in methods:
+                try:
+                    text = method()
+                    if len(text) > len(best_text):
+                        best_text = text
+                    if len(best_text) >= expected_min:
+                        break
+                except Exception as e:
+                    logger.warning(f"Text extraction method failed: {e}")
+                    continue
+        finally:
+            if doc:
+                doc.close()
         
-        return best_text
+        return best_text, metadata
     
     def clean_text(self, text: str) -> str:
         """Clean and preprocess extracted text"""
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove page numbers and headers
-        text = re.sub(r'^\d+\s*$', '', text, flags=re.MULTILINE)
+        # Collapse whitespace; split/join runs in C and is faster than a regex pass
+        return ' '.join(self.clean_words(text))
+    
+    def clean_words(self, text: str) -> List[str]:
+        """Clean extracted text into its words; joined with single spaces they give clean_text()"""
+        # Remove page numbers while line breaks are still present
+        text = _PAGE_NUMBER_RE.sub('', text)
         
         # Remove common PDF artifacts
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)\[\]\{\}\"\']', '', text)
+        text = _ARTIFACT_RE.sub('', text)
         
-        # Fix common OCR issues
-        text = text.replace('|', 'I')
-        text = text.replace('0', 'O')  # Be careful with this one
-        
-        return text.strip()
+        return text.split()
     
-    def extract_metadata(self, pdf_path: str) -> Dict:
-        """Extract PDF metadata"""
+    def extract_metadata(self, pdf_path: str, data: Optional[bytes] = None) -> Dict:
+        """Extract PDF metadata, from the file contents if already read"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                metadata = pdf_reader.metadata
-                return {
-                    'title': metadata.get('/Title', ''),
-                    'author': metadata.get('/Author', ''),
-                    'subject': metadata.get('/Subject', ''),
-                    'creator': metadata.get('/Creator', ''),
-                    'producer': metadata.get('/Producer', ''),
-                    'pages': len(pdf_reader.pages)
-                }
+            import fitz
+            
+            if data is not None:
+                with fitz.open(stream=data, filetype='pdf') as doc:
+                    return _metadata_from_doc(doc)
+            
+            # Repeat calls for an unchanged file are served from memory
+            stat = os.stat(pdf_path)
+            return dict(_cached_file_metadata(os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size))
         except Exception as e:
             logger.error(f"Metadata extraction failed: {e}")
             return {}
     
-    def read_pdf(self, pdf_path: str) -> Dict:
+    def read_pdf(self, pdf_path: str, data: Optional[bytes] = None) -> Dict:
         """Main method to read PDF and return structured data"""
+        result = self.parse_pdf(pdf_path, data)
+        self.add_result(result)
+        return result
+    
+    def parse_pdf(self, pdf_path: str, data: Optional[bytes] = None) -> Dict:
+        """Extract, clean and chunk a PDF without recording it in this reader, from its bytes if already read"""
         if not os.path.exists(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
         
         logger.info(f"Reading PDF: {pdf_path}")
         
-        # Extract text using combined method
-        raw_text = self.extract_text_combined(pdf_path)
-        cleaned_text = self.clean_text(raw_text)
+        # An unchanged path, modification time and size maps straight to the content key without hashing;
+        # temp files such as uploads are never seen again under the same path, so they get no such entry
+        stat_key = None
+        content_key = None
+        if not _is_temp_file(pdf_path):
+            stat = os.stat(pdf_path)
+            stat_key = self._hash_key(f"{os.path.abspath(pdf_path)}|{stat.st_mtime_ns}|{stat.st_size}".encode('utf-8'))
+            content_key = self._cache_load(f"path-{stat_key}")
+        
+        if content_key is not None:
+            cached = self._cache_load(f"pdf-{content_key}")
+            if cached is not None:
+                return self._use_cached(pdf_path, cached)
+        
+        # Read the file once and share the bytes between text and metadata extraction
+        if data is None:
+            with open(pdf_path, 'rb') as file:
+                data = file.read()
+        
+        # The same content under another name, e.g. a re-uploaded file, is also a hit
+        content_key = self._hash_key(data)
+        if stat_key is not None:
+            self._cache_store(f"path-{stat_key}", content_key)
+        cached = self._cache_load(f"pdf-{content_key}")
+        if cached is not None:
+            return self._use_cached(pdf_path, cached)
         
-        # Extract metadata
-        metadata = self.extract_metadata(pdf_path)
+        # Extract text and metadata using combined method
+        raw_text, metadata = self._open_and_extract(pdf_path, data)
         
-        # Split into chunks for processing
-        chunks = self.split_into_chunks(cleaned_text)
+        # One word list gives the cleaned text, the chunk offsets into it and the word count
+        words = self.clean_words(raw_text)
+        cleaned_text = ' '.join(words)
+        chunk_offsets = self.chunk_word_offsets(words)
         
         result = {
             'file_path': pdf_path,
-            'raw_text': raw_text,
             'cleaned_text': cleaned_text,
             'metadata': metadata,
-            'chunks': chunks,
-            'total_chunks': len(chunks),
-            'word_count': len(cleaned_text.split())
+            'chunk_offsets': chunk_offsets,
+            'total_chunks': len(chunk_offsets),
+            'word_count': len(words)
         }
         
-        self.extracted_texts.append(result)
+        self._cache_store(f"pdf-{content_key}", result)
         return result
     
-    def split_into_chunks(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Split text into overlapping chunks for processing"""
-        words = text.split()
-        chunks = []
+    def add_result(self, result: Dict):
+        """Record a parsed PDF, moving its text and chunk offsets into the SQLite store"""
+        text = result['cleaned_text']
+        offsets = result['chunk_offsets']
         
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk.strip():
-                chunks.append(chunk)
+        with self._db_lock:
+            document_id = self.db.execute(
+                "INSERT INTO documents VALUES (?, ?, ?, ?, ?)",
+                (
+                    result['file_path'],
+                    json.dumps(result['metadata']),
+                    result['word_count'],
+                    result['total_chunks'],
+                    text
+                )
+            ).lastrowid
+            
+            # Offset rows and index rows share rowids, so a match maps straight back to its slice
+            first_id = self.db.execute("SELECT COALESCE(MAX(rowid), 0) + 1 FROM chunk_offsets").fetchone()[0]
+            self.db.executemany(
+                "INSERT INTO chunk_offsets (rowid, document_id, start, end) VALUES (?, ?, ?, ?)",
+                ((first_id + i, document_id, start, end) for i, (start, end) in enumerate(offsets))
+            )
+            self.db.executemany(
+                "INSERT INTO chunks (rowid, chunk_text) VALUES (?, ?)",
+                enumerate(iter_chunk_slices(text, offsets), first_id)
+            )
+            self.db.commit()
         
-        return chunks
+        self.extracted_texts.append({
+            'file_path': result['file_path'],
+            'metadata': result['metadata'],
+            'total_chunks': result['total_chunks'],
+            'word_count': result['word_count']
+        })
+    
+    def _use_cached(self, pdf_path: str, result: Dict) -> Dict:
+        """Return a cached result as read from the given path"""
+        logger.info(f"Using cached result for: {pdf_path}")
+        result['file_path'] = pdf_path
+        return result
+    
+    def _hash_key(self, data: bytes) -> str:
+        """Cache key for some bytes, tied to the current cache version"""
+        digest = hashlib.blake2b(data, digest_size=16)
+        digest.update(str(self.CACHE_VERSION).encode('ascii'))
+        return digest.hexdigest()
     
-    def read_multiple_pdfs(self, pdf_directory: str) -> List[Dict]:
-        """Read multiple PDFs from a directory"""
-        pdf_files = []
-        for ext in ['*.pdf', '*.PDF']:
-            pdf_files.extend(Path(pdf_directory).glob(ext))
+    def _cache_load(self, name: str):
+        """Load a cached object, or None if caching is disabled or it is missing"""
+        if not self.cache_dir:
+            return None
         
-        results = []
-        for pdf_file in pdf_files:
+        path = self.cache_dir / f"{name}.pkl"
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable PDF cache entry {name}: {e}")
+            return None
+        
+        # The modification time doubles as the last use, which eviction orders by
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+    
+    def _cache_store(self, name: str, value):
+        """Write a cached object atomically so concurrent readers never see a partial file"""
+        if not self.cache_dir:
+            return
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{name}.pkl"
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._prune_cache()
+        except Exception as e:
+            logger.warning(f"Failed to write PDF cache entry {name}: {e}")
+    
+    def _prune_cache(self):
+        """Delete least recently used cache entries until the cache fits in CACHE_MAX_BYTES"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.pkl'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.CACHE_MAX_BYTES:
+                break
             try:
-                result = self.read_pdf(str(pdf_file))
-                results.append(result)
-                logger.info(f"Successfully processed: {pdf_file.name}")
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file.name}: {e}")
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+    
+    def split_into_chunks(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[Tuple[int, int]]:
+        """Split cleaned text into overlapping chunks, returned as (start, end) offsets into it"""
+        return self.chunk_word_offsets(text.split(), chunk_size, overlap)
+    
+    def chunk_word_offsets(
+        self,
+        words: List[str],
+        chunk_size: int = 1000,
+        overlap: int = 200
+    ) -> List[Tuple[int, int]]:
+        """Offsets of overlapping word windows in ' '.join(words), without copying any text"""
+        # Word i starts after the i earlier words and their single separating spaces
+        starts = list(itertools.accumulate((len(word) + 1 for word in words), initial=0))
+        return [
+            (starts[i], starts[min(i + chunk_size, len(words))] - 1)
+            for i in range(0, len(words), chunk_size - overlap)
+        ]
+    
+    def read_multiple_pdfs(self, pdf_directory: str, max_workers: Optional[int] = None) -> List[Dict]:
+        """Read multiple PDFs from a directory, parsing them in parallel worker processes"""
+        pdf_files = [Path(entry.path) for entry in iter_pdfs(pdf_directory)]
+        
+        if not pdf_files:
+            return []
+        
+        max_workers = min(max_workers or os.cpu_count() or 1, len(pdf_files))
+        
+        results = []
+        # Spawned like the page pool: the prefetch and quote-writer threads may be running here
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as executor:
+            # Each worker builds its own reader, so no reader state is pickled
+            futures = [executor.submit(read_pdf_file, str(pdf_file)) for pdf_file in pdf_files]
+            
+            # Collected in submission order so results follow the directory listing
+            for pdf_file, future in zip(pdf_files, futures):
+                try:
+                    result = future.result()
+                    self.add_result(result)
+                    results.append(result)
+                    logger.info(f"Successfully processed: {pdf_file.name}")
+                except Exception as e:
+                    logger.error(f"Failed to process {pdf_file.name}: {e}")
         
         return results
     
     def get_all_text(self) -> str:
         """Get all extracted text combined"""
-        return "\n\n".join([result['cleaned_text'] for result in self.extracted_texts])
+        rows = self.db.execute("SELECT cleaned_text FROM documents ORDER BY rowid")
+        return "\n\n".join(row[0] for row in rows)
+    
+    def iter_chunks(self) -> Iterator[str]:
+        """Iterate over text chunks from all PDFs, holding one document's text at a time"""
+        document_ids = [row[0] for row in self.db.execute("SELECT rowid FROM documents ORDER BY rowid")]
+        for document_id in document_ids:
+            text = self.db.execute("SELECT cleaned_text FROM documents WHERE rowid = ?", (document_id,)).fetchone()[0]
+            offsets = self.db.execute(
+                "SELECT start, end FROM chunk_offsets WHERE document_id = ? ORDER BY rowid",
+                (document_id,)
+            ).fetchall()
+            yield from iter_chunk_slices(text, offsets)
     
     def get_all_chunks(self) -> List[str]:
         """Get all text chunks from all PDFs"""
-        all_chunks = []
-        for result in self.extracted_texts:
-            all_chunks.extend(result['chunks'])
-        return all_chunks
+        return list(self.iter_chunks())
+    
+    def search_chunks(self, query: str, limit: int = 10) -> List[Dict]:
+        """Full-text search over the chunks of all read PDFs, best matches first"""
+        # Quote each term so punctuation in the query is not parsed as FTS5 syntax
+        terms = [f'"{term.replace(chr(34), chr(34) * 2)}"' for term in query.split()]
+        if not terms:
+            return []
+        
+        rows = self.db.execute(
+            """SELECT d.file_path, substr(d.cleaned_text, o.start + 1, o.end - o.start)
+            FROM chunks
+            JOIN chunk_offsets o ON o.rowid = chunks.rowid
+            JOIN documents d ON d.rowid = o.document_id
+            WHERE chunks MATCH ? ORDER BY rank LIMIT ?""",
+            (" OR ".join(terms), limit)
+        )
+        return [{'file_path': file_path, 'chunk': chunk} for file_path, chunk in rows]
+
+
+def read_pdf_file(pdf_path: str) -> Dict:
+    """Parse a single PDF with a fresh reader; picklable entry point for worker processes"""
+    return PDFReader().parse_pdf(pdf_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+"""
+Redis Cache Module for Soros Chatbot
+Exact-match response cache shared by every API worker
+"""
+
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from .embeddings import normalize_query
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RedisResponseCache:
+    """Responses keyed by a hash of the normalised question, stored in Redis with a TTL"""
+
+    def __init__(self, url: str, ttl_seconds: int = 7 * 24 * 3600, key_prefix: str = "soros:response"):
+        # Imported here so redis is only needed when REDIS_URL is set
+        import redis.asyncio as redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, query: str, namespace: str) -> str:
+        """Redis key for a question; paraphrases that normalise the same way share it"""
+        digest = hashlib.sha1(normalize_query(query).encode('utf-8')).hexdigest()
+        return f"{self.key_prefix}:{namespace}:{digest}"
+
+    async def lookup(self, query: str, namespace: str = "default") -> Optional[str]:
+        """Return the cached response, or None on a miss or if Redis is unreachable"""
+        try:
+            response = await self.client.get(self._key(query, namespace))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache lookup failed: {e}")
+            return None
+
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return response
+
+    async def store(self, query: str, response: str, namespace: str = "default"):
+        """Store a response; failures are logged and otherwise ignored"""
+        try:
+            await self.client.set(self._key(query, namespace), response, ex=self.ttl_seconds)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache store failed: {e}")
+
+    async def close(self):
+        """Close the connection pool"""
+        await self.client.aclose()
+
+    def get_stats(self) -> Dict:
+        """Get cache hit/miss statistics for this worker"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'ttl_seconds': self.ttl_seconds
+        }
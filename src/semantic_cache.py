@@ -0,0 +1,153 @@
+"""
+Semantic Cache Module for Soros Chatbot
+Serves stored responses for questions that are paraphrases of earlier ones
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from .embeddings import embed_query, embedding_cache_info, get_encoder, quantize_int8
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """SQLite-backed response cache looked up by embedding cosine similarity"""
+
+    def __init__(
+        self,
+        db_path: str,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        threshold: float = 0.92,
+        ttl_seconds: int = 7 * 24 * 3600,
+        max_entries: int = 2000
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.model_name = model_name
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        # Load the model up front so a missing dependency disables the cache at startup
+        get_encoder(model_name)
+
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+
+        # Version 1 stores int8 embeddings with a per-row scale; version 2 records the embedding model
+        # of each row, since processes sharing the file may be configured with different models.
+        # Rows from older versions are dropped
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < 2:
+            self.conn.execute("DROP TABLE IF EXISTS semantic_cache")
+            self.conn.execute("PRAGMA user_version = 2")
+
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS semantic_cache (
+                namespace TEXT NOT NULL,
+                model TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                scale REAL NOT NULL,
+                response TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                last_used_at INTEGER NOT NULL
+            )"""
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_semantic_cache_namespace ON semantic_cache (namespace, model, created_at)"
+        )
+        self.conn.commit()
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a query through the process-wide embedding cache"""
+        return embed_query(text, self.model_name)
+
+    def lookup(self, query: str, namespace: str = "default") -> Optional[str]:
+        """Return the cached response for the closest stored query, if similar enough"""
+        vector = self.embed(query)
+        cutoff = int(time.time()) - self.ttl_seconds
+
+        # Only rows embedded by this model share its vector space and dimension
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT rowid, embedding, scale, response FROM semantic_cache "
+                "WHERE namespace = ? AND model = ? AND created_at >= ?",
+                (namespace, self.model_name, cutoff)
+            ).fetchall()
+
+            if rows:
+                matrix = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.int8).reshape(len(rows), -1)
+                scales = np.fromiter((row[2] for row in rows), dtype=np.float32, count=len(rows))
+
+                # Dequantize through the per-row scale; the float32 product stays a single BLAS call
+                similarities = (matrix.astype(np.float32) @ vector) * scales
+                best = int(np.argmax(similarities))
+
+                if similarities[best] >= self.threshold:
+                    self.conn.execute(
+                        "UPDATE semantic_cache SET last_used_at = ? WHERE rowid = ?",
+                        (int(time.time()), rows[best][0])
+                    )
+                    self.conn.commit()
+                    self.hits += 1
+                    return rows[best][3]
+
+            self.misses += 1
+            return None
+
+    def store(self, query: str, response: str, namespace: str = "default"):
+        """Store a response, expiring old entries and evicting least recently used ones"""
+        quantized, scales = quantize_int8(self.embed(query))
+        now = int(time.time())
+
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO semantic_cache VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (namespace, self.model_name, query, quantized.tobytes(), float(scales[0]), response, now, now)
+            )
+            self.conn.execute(
+                "DELETE FROM semantic_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+            self.conn.execute(
+                """DELETE FROM semantic_cache WHERE rowid IN (
+                    SELECT rowid FROM semantic_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+            self.conn.commit()
+
+    def clear(self):
+        """Remove all cached responses"""
+        with self._lock:
+            self.conn.execute("DELETE FROM semantic_cache")
+            self.conn.commit()
+
+    def get_stats(self) -> Dict:
+        """Get cache hit/miss statistics"""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM semantic_cache").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        embedding_info = embedding_cache_info()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'threshold': self.threshold,
+            'embedding_cache_hits': embedding_info.hits,
+            'embedding_cache_size': embedding_info.currsize
+        }
@@ -3,47 +3,119 @@ Soros Chatbot - Main chatbot implementation
 Integrates PDF reader, knowledge base, and OpenAI for Soros-style conversations
 """
 
+import asyncio
+import importlib.util
 import logging
-from pathlib import Path
-from typing import Dict, List, Optional
-import sys
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
 
-# Add current directory to path for imports
-sys.path.append(str(Path(__file__).parent))
+import orjson
 
-from pdf_reader import PDFReader
-from soros_knowledge_base import SorosKnowledgeBase
+from .pdf_reader import PDFReader, iter_pdfs, prefetch_pdfs, read_pdf_file
+from .soros_knowledge_base import SorosKnowledgeBase
 
-# LangChain imports
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import SystemMessage, HumanMessage
+# LangChain, OpenAI, httpx and the embedding stack take over a second to import, so they are
+# imported where they are used; importing this module stays cheap until a chatbot is created
+if TYPE_CHECKING:
+    from langchain_core.messages import ToolMessage
+    from .semantic_cache import SemanticCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Knowledge base lookup the model calls when a question needs it, so the prompt itself never
+# carries per-question text and its prefix stays cacheable across turns
+SEARCH_KB_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "search_soros_kb",
+        "description": "Search George Soros's knowledge base for concepts related to a question and a quote from his writings",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The topic or question to look up, e.g. 'reflexivity in currency markets'"
+                }
+            },
+            "required": ["query"]
+        }
+    }
+}
+
 class SorosChatbot:
     """Main Soros chatbot class"""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-3.5-turbo"):
+    # While loading PDFs, quotes are written to the knowledge base once this many are pending
+    # or the oldest has waited this long, instead of once per file or only at the end
+    QUOTE_FLUSH_THRESHOLD = 32
+    QUOTE_FLUSH_MAX_WAIT_MS = 500
+    
+    # Knowledge base lookups allowed per turn before the model has to answer
+    MAX_TOOL_ROUNDS = 2
+    
+    # Idle connections to the OpenAI API kept open between turns, and for how long
+    HTTP_KEEPALIVE_CONNECTIONS = 32
+    HTTP_KEEPALIVE_EXPIRY_SECONDS = 60
+    
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-3.5-turbo",
+        embedding_model: Optional[str] = None,
+        semantic_cache: Optional["SemanticCache"] = None,
+        memory_max_tokens: int = 1500
+    ):
         """Initialize the Soros chatbot"""
+        import httpx
+        from langchain.memory import ConversationSummaryBufferMemory
+        from langchain_openai import ChatOpenAI
+        
         self.api_key = api_key
         
+        # Answers to paraphrases of earlier questions are served by chat() without calling the model
+        self.semantic_cache = semantic_cache
+        
         # Initialize components
         self.pdf_reader = PDFReader()
-        self.knowledge_base = SorosKnowledgeBase()
+        self.knowledge_base = SorosKnowledgeBase(embedding_model=embedding_model)
+        
+        # Long-lived HTTP clients so every turn, tool round and summary reuses warm TCP/TLS connections;
+        # HTTP/2 multiplexes concurrent requests over one of them when the h2 package is installed
+        limits = httpx.Limits(
+            max_keepalive_connections=self.HTTP_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=self.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+        http2 = importlib.util.find_spec("h2") is not None
+        self.http_client = httpx.Client(http2=http2, limits=limits, timeout=30)
+        self.http_async_client = httpx.AsyncClient(http2=http2, limits=limits, timeout=30)
         
         # Initialize language model
         self.llm = ChatOpenAI(
             model=model,
             temperature=0.7,
             max_tokens=1000,
-            openai_api_key=self.api_key
+            openai_api_key=self.api_key,
+            request_timeout=30,
+            max_retries=2,
+            http_client=self.http_client,
+            http_async_client=self.http_async_client
         )
         
-        # Conversation memory
-        self.memory = ConversationBufferMemory(
+        # With context the model may look things up; the final round forbids it so a turn always ends in an answer
+        self.llm_with_tools = self.llm.bind_tools([SEARCH_KB_TOOL])
+        self.llm_answer_only = self.llm.bind_tools([SEARCH_KB_TOOL], tool_choice="none")
+        
+        # Conversation memory; turns beyond the token limit are folded into a running summary once
+        self.memory = ConversationSummaryBufferMemory(
+            llm=self.llm,
+            max_token_limit=memory_max_tokens,
             memory_key="history",
             return_messages=True
         )
@@ -51,8 +123,21 @@ class SorosChatbot:
         # Loaded PDFs
         self.loaded_pdfs = []
         
-        # System prompt for Soros personality
-        self.system_prompt = self._create_system_prompt()
+        # achat() calls still waiting on the model, keyed by (message, use_context)
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        
+        # System prompt for Soros personality, re-rendered only when the writing style changes
+        self._system_prompt = None
+        self._system_prompt_version = None
+    
+    @property
+    def system_prompt(self) -> str:
+        """The system prompt, reused byte-identical across turns so provider prompt caches keep hitting"""
+        version = self.knowledge_base.style_version
+        if self._system_prompt_version != version:
+            self._system_prompt = self._create_system_prompt()
+            self._system_prompt_version = version
+        return self._system_prompt
     
     def _create_system_prompt(self) -> str:
         """Create the system prompt for Soros personality"""
@@ -95,26 +180,103 @@ Remember: You are not just an AI, you are George Soros responding to questions a
     
     def load_pdf(self, pdf_path: str) -> Dict:
         """Load a PDF and extract Soros-related content"""
+        return self.load_pdfs_batch([pdf_path])[0]
+    
+    def _register_pdf(self, pdf_path: str, pdf_data: Dict) -> Dict:
+        """Extract Soros-related content from parsed PDF data and record the PDF"""
+        # Extract Soros-related content
+        extracted_content = self.knowledge_base.extract_from_pdf(pdf_data['cleaned_text'])
+        
+        # Add to loaded PDFs; the text itself stays in the PDF reader's store
+        self.loaded_pdfs.append({
+            'path': pdf_path,
+            'data': {
+                'metadata': pdf_data['metadata'],
+                'word_count': pdf_data['word_count'],
+                'total_chunks': pdf_data['total_chunks']
+            },
+            'extracted': extracted_content
+        })
+        
+        logger.info(f"Successfully loaded PDF: {pdf_path}")
+        logger.info(f"Extracted {len(extracted_content['quotes'])} quotes and {len(extracted_content['concepts'])} concepts")
+        
+        return extracted_content
+    
+    def load_pdfs_batch(self, pdf_paths: List[str]) -> List[Dict]:
+        """Load several PDFs, saving their quotes to the knowledge base in batches"""
+        results = []
+        
+        # Three stages: files are read ahead in one thread, parsed and mined for quotes in this one,
+        # and the quotes are saved in batches by a third
+        quote_queue = queue.Queue(maxsize=16)
+        writer = threading.Thread(target=self._write_quotes, args=(quote_queue,), name="quote-writer")
+        writer.start()
+        
+        try:
+            for pdf_path, data in prefetch_pdfs(pdf_paths):
+                results.append(self._load_parsed_pdf(pdf_path, data, quote_queue))
+        finally:
+            quote_queue.put(None)
+            writer.join()
+        
+        return results
+    
+    def _load_parsed_pdf(self, pdf_path: str, data: Optional[bytes], quote_queue: queue.Queue) -> Dict:
+        """Parse and register one PDF of a batch, handing its quotes to the writer stage"""
         try:
             # Read PDF
-            pdf_data = self.pdf_reader.read_pdf(pdf_path)
+            pdf_data = self.pdf_reader.read_pdf(pdf_path, data)
+            extracted_content = self._register_pdf(pdf_path, pdf_data)
+            quote_queue.put(extracted_content['quotes'])
             
-            # Extract Soros-related content
-            extracted_content = self.knowledge_base.extract_from_pdf(pdf_data['cleaned_text'])
+            return {
+                'success': True,
+                'pdf_data': pdf_data,
+                'extracted_content': extracted_content
+            }
             
-            # Add to loaded PDFs
-            self.loaded_pdfs.append({
-                'path': pdf_path,
-                'data': pdf_data,
-                'extracted': extracted_content
-            })
+        except Exception as e:
+            logger.error(f"Failed to load PDF {pdf_path}: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def _write_quotes(self, quote_queue: queue.Queue):
+        """Writer stage: add queued quotes to the knowledge base in batches until a None arrives"""
+        pending = []
+        deadline = None
+        
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                quotes = quote_queue.get(timeout=timeout)
+            except queue.Empty:
+                quotes = []
+            if quotes is None:
+                break
             
-            # Add new quotes to knowledge base
-            for quote in extracted_content['quotes']:
-                self.knowledge_base.add_quote(quote)
+            if quotes and not pending:
+                deadline = time.monotonic() + self.QUOTE_FLUSH_MAX_WAIT_MS / 1000
+            pending.extend(quotes)
+            
+            if len(pending) >= self.QUOTE_FLUSH_THRESHOLD or (pending and time.monotonic() >= deadline):
+                self.knowledge_base.add_quotes(pending)
+                pending = []
+                deadline = None
+        
+        if pending:
+            self.knowledge_base.add_quotes(pending)
+    
+    def load_pdf_data(self, pdf_path: str, pdf_data: Dict) -> Dict:
+        """Load a PDF that was already parsed elsewhere, e.g. in a worker process"""
+        try:
+            self.pdf_reader.add_result(pdf_data)
+            extracted_content = self._register_pdf(pdf_path, pdf_data)
             
-            logger.info(f"Successfully loaded PDF: {pdf_path}")
-            logger.info(f"Extracted {len(extracted_content['quotes'])} quotes and {len(extracted_content['concepts'])} concepts")
+            # Add new quotes to knowledge base
+            self.knowledge_base.add_quotes(extracted_content['quotes'])
             
             return {
                 'success': True,
@@ -129,64 +291,232 @@ Remember: You are not just an AI, you are George Soros responding to questions a
                 'error': str(e)
             }
     
+    def _find_pdfs(self, pdf_directory: str) -> List[str]:
+        """Paths of the PDFs in a directory, any extension case, each listed once"""
+        return [entry.path for entry in iter_pdfs(pdf_directory)]
+    
     def load_multiple_pdfs(self, pdf_directory: str) -> List[Dict]:
         """Load multiple PDFs from a directory"""
+        return self.load_pdfs_batch(self._find_pdfs(pdf_directory))
+    
+    async def aload_multiple_pdfs(self, pdf_directory: str, max_workers: Optional[int] = None) -> List[Dict]:
+        """Load multiple PDFs from a directory, parsing them concurrently without blocking the event loop"""
+        pdf_paths = self._find_pdfs(pdf_directory)
+        if not pdf_paths:
+            return []
+        
+        # Parsing is CPU-bound, so it runs in worker processes rather than threads; spawned, since
+        # forking while the event loop's executor threads are running can deadlock the children
+        loop = asyncio.get_running_loop()
+        max_workers = min(max_workers or os.cpu_count() or 1, len(pdf_paths))
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=spawn) as executor:
+            parsed = await asyncio.gather(
+                *(loop.run_in_executor(executor, read_pdf_file, pdf_path) for pdf_path in pdf_paths),
+                return_exceptions=True
+            )
+        
         results = []
-        pdf_files = []
+        new_quotes = []
         
-        for ext in ['*.pdf', '*.PDF']:
-            pdf_files.extend(Path(pdf_directory).glob(ext))
+        # Recorded in directory order once every file is parsed
+        for pdf_path, pdf_data in zip(pdf_paths, parsed):
+            try:
+                if isinstance(pdf_data, BaseException):
+                    raise pdf_data
+                self.pdf_reader.add_result(pdf_data)
+                extracted_content = self._register_pdf(pdf_path, pdf_data)
+                new_quotes.extend(extracted_content['quotes'])
+                
+                results.append({
+                    'success': True,
+                    'pdf_data': pdf_data,
+                    'extracted_content': extracted_content
+                })
+                
+            except Exception as e:
+                logger.error(f"Failed to load PDF {pdf_path}: {e}")
+                results.append({
+                    'success': False,
+                    'error': str(e)
+                })
+        
+        # Add new quotes to knowledge base
+        self.knowledge_base.add_quotes(new_quotes)
+        
+        return results
+    
+    def _build_messages(self, message: str) -> List:
+        """Build the message list for a turn"""
+        from langchain.schema import HumanMessage, SystemMessage
+        
+        # Everything before the new question only changes when a turn is added, so providers can
+        # reuse their prompt cache for it; knowledge base context arrives through tool calls instead
+        messages = [SystemMessage(content=self.system_prompt)]
+        
+        summary = self.memory.moving_summary_buffer
+        if summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation: {summary}"))
+        
+        # Get conversation history
+        messages.extend(self.memory.chat_memory.messages)
+        
+        messages.append(HumanMessage(content=message))
+        
+        return messages
+    
+    def _model_for_round(self, use_context: bool, round_number: int):
+        """Model to call for a round of a turn"""
+        if not use_context:
+            return self.llm
+        if round_number < self.MAX_TOOL_ROUNDS:
+            return self.llm_with_tools
+        return self.llm_answer_only
+    
+    def search_soros_kb(self, query: str) -> str:
+        """Run the search_soros_kb tool, returning the matches as JSON"""
+        concepts = self.knowledge_base.search_concepts(query)
         
-        for pdf_file in pdf_files:
-            result = self.load_pdf(str(pdf_file))
-            results.append(result)
+        return orjson.dumps({
+            'quote': self.knowledge_base.get_random_quote(),
+            'concepts': [
+                {'concept': concept['concept'], 'definition': concept['data']['definition']}
+                for concept in concepts[:3]  # Limit to top 3
+            ]
+        }).decode('utf-8')
+    
+    def _run_tools(self, response) -> List["ToolMessage"]:
+        """Answer the tool calls of a model response"""
+        from langchain_core.messages import ToolMessage
         
+        results = []
+        for call in response.tool_calls:
+            if call['name'] == SEARCH_KB_TOOL['function']['name']:
+                content = self.search_soros_kb(call['args'].get('query', ''))
+            else:
+                content = f"Unknown tool: {call['name']}"
+            results.append(ToolMessage(content=content, tool_call_id=call['id']))
         return results
     
+    def _complete(self, messages: List, use_context: bool) -> str:
+        """Call the model, answering its knowledge base lookups, until it responds"""
+        for round_number in range(self.MAX_TOOL_ROUNDS + 1):
+            response = self._model_for_round(use_context, round_number).invoke(messages)
+            if not response.tool_calls:
+                break
+            messages.extend([response, *self._run_tools(response)])
+        return response.content
+    
+    async def _acomplete(self, messages: List, use_context: bool) -> str:
+        """Async counterpart of _complete()"""
+        for round_number in range(self.MAX_TOOL_ROUNDS + 1):
+            response = await self._model_for_round(use_context, round_number).ainvoke(messages)
+            if not response.tool_calls:
+                break
+            # Lookups may embed the query, so they run off the event loop
+            messages.extend([response, *await asyncio.to_thread(self._run_tools, response)])
+        return response.content
+    
+    def _remember(self, user_content: str, response: str):
+        """Save a completed turn to memory, summarizing the oldest turns if over the token limit"""
+        self.memory.save_context({"input": user_content}, {"output": response})
+    
+    def respond(self, message: str, use_context: bool = True) -> str:
+        """Generate a response, raising on failure instead of apologising"""
+        response = self._complete(self._build_messages(message), use_context)
+        
+        # Only the question and the answer are remembered, not the lookups in between
+        self._remember(message, response)
+        return response
+    
+    async def achat(self, message: str, use_context: bool = True) -> str:
+        """Async counterpart of respond() for use inside an event loop"""
+        # Identical questions arriving while one is being answered share its model call and its turn in memory
+        key = (message, use_context)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._achat(message, use_context))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shielded so one caller going away does not cancel the call the others are waiting on
+        return await asyncio.shield(task)
+    
+    async def _achat(self, message: str, use_context: bool) -> str:
+        """Answer a message and remember the turn"""
+        # ainvoke goes through the AsyncOpenAI client, so the request does not hold a thread
+        response = await self._acomplete(self._build_messages(message), use_context)
+        
+        # Saving may call the model to summarize old turns, so it runs off the event loop
+        await asyncio.to_thread(self._remember, message, response)
+        return response
+    
+    async def achat_batch(self, messages: List[str], use_context: bool = True) -> List[str]:
+        """Answer independent messages with concurrent requests, returning responses in order"""
+        # Every request sees the history from before the batch; turns are remembered in input order
+        prepared = [self._build_messages(message) for message in messages]
+        responses = await asyncio.gather(*(self._acomplete(turn, use_context) for turn in prepared))
+        
+        for message, response in zip(messages, responses):
+            await asyncio.to_thread(self._remember, message, response)
+        return responses
+    
+    async def achat_stream(self, message: str, use_context: bool = True) -> AsyncIterator[str]:
+        """Yield the response in pieces as the model generates it"""
+        messages = self._build_messages(message)
+        
+        parts = []
+        for round_number in range(self.MAX_TOOL_ROUNDS + 1):
+            # Chunks are summed so tool calls split across them are reassembled
+            response = None
+            async for chunk in self._model_for_round(use_context, round_number).astream(messages):
+                response = chunk if response is None else response + chunk
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+            
+            if response is None or not response.tool_calls:
+                break
+            messages.extend([response, *await asyncio.to_thread(self._run_tools, response)])
+        
+        # Only completed responses are remembered
+        await asyncio.to_thread(self._remember, message, "".join(parts))
+    
     def chat(self, message: str, use_context: bool = True) -> str:
         """Chat with the Soros chatbot"""
-        try:
-            # Get conversation history
-            history = self.memory.chat_memory.messages
+        # Cached answers differ depending on whether knowledge base context was used
+        namespace = "context" if use_context else "plain"
+        
+        if self.semantic_cache:
+            try:
+                cached = self.semantic_cache.lookup(message, namespace)
+            except Exception as e:
+                logger.warning(f"Semantic cache lookup failed: {e}")
+                cached = None
             
-            if use_context:
-                # Generate context-aware prompt
-                context_prompt = self.knowledge_base.generate_context_prompt(message)
-                
-                # Create messages
-                messages = [
-                    SystemMessage(content=self.system_prompt),
-                    *history,
-                    HumanMessage(content=context_prompt)
-                ]
-                
-                # Get response
-                response = self.llm(messages)
-                
-                # Save to memory
-                self.memory.chat_memory.add_user_message(context_prompt)
-                self.memory.chat_memory.add_ai_message(response.content)
-                
-                return response.content
-            else:
-                # Simple conversation without additional context
-                messages = [
-                    SystemMessage(content=self.system_prompt),
-                    *history,
-                    HumanMessage(content=message)
-                ]
-                
-                response = self.llm(messages)
-                
-                # Save to memory
-                self.memory.chat_memory.add_user_message(message)
-                self.memory.chat_memory.add_ai_message(response.content)
-                
-                return response.content
-                
+            if cached is not None:
+                self._remember(message, cached)
+                return cached
+        
+        try:
+            response = self.respond(message, use_context=use_context)
         except Exception as e:
             logger.error(f"Chat error: {e}")
             return f"I apologize, but I'm experiencing some difficulties. As I often say, 'I'm only rich because I know when I'm wrong.' Let me try to address your question: {message}"
+        
+        # Only real answers are cached, never the apology above
+        if self.semantic_cache:
+            try:
+                self.semantic_cache.store(message, response, namespace)
+            except Exception as e:
+                logger.warning(f"Semantic cache store failed: {e}")
+        
+        return response
+    
+    async def aclose(self):
+        """Close the HTTP connections to the OpenAI API"""
+        self.http_client.close()
+        await self.http_async_client.aclose()
     
     def get_conversation_history(self) -> List[Dict]:
         """Get the conversation history"""
@@ -227,11 +557,17 @@ Remember: You are not just an AI, you are George Soros responding to questions a
     
     def get_system_stats(self) -> Dict:
         """Get system statistics"""
+        from .embeddings import embedding_cache_info
+        
+        embedding_info = embedding_cache_info()
         return {
             'loaded_pdfs': len(self.loaded_pdfs),
             'total_quotes': len(self.knowledge_base.get_all_quotes()),
             'total_concepts': len(self.knowledge_base.get_all_concepts()),
-            'conversation_messages': len(self.get_conversation_history())
+            'conversation_messages': len(self.get_conversation_history()),
+            'embedding_cache_hits': embedding_info.hits,
+            'embedding_cache_misses': embedding_info.misses,
+            'embedding_cache_size': embedding_info.currsize
         }
 
 
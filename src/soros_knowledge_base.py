@@ -3,22 +3,76 @@ Soros Knowledge Base Module
 Manages George Soros's writings, speeches, and philosophical concepts
 """
 
-import json
+import atexit
+import heapq
 import logging
+import random
+import threading
+import weakref
 from typing import List, Dict, Optional, Any
 from pathlib import Path
+import orjson
 import requests
 from bs4 import BeautifulSoup
 import re
 
+# Optional: one-pass multi-keyword scan of PDF text; without it each keyword is a substring search
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Module-level generator so picking a quote each turn is a single randrange and index
+_RNG = random.Random()
+
+# Words as the quote scorer sees them; hyphenated terms like boom-bust stay whole
+_WORD_RE = re.compile(r"[\w-]+")
+
+
+def _save_at_exit(kb_ref: "weakref.ref"):
+    """Save a knowledge base at interpreter exit if it is still alive"""
+    kb = kb_ref()
+    if kb is not None:
+        kb.save_knowledge_base()
+
+
+def _build_keyword_automaton(keywords):
+    """Aho-Corasick automaton matching any of the keywords, or None without pyahocorasick"""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
 
 class SorosKnowledgeBase:
     """Knowledge base for George Soros's writings and philosophy"""
     
-    def __init__(self, data_dir: str = "data/soros"):
+    # Potential quotes in PDF text: anything of 20+ characters between double quotes
+    _QUOTE_RE = re.compile(r'"([^"]{20,})"')
+    
+    # Key Soros concepts looked for in PDF text, already lowercase
+    _SOROS_KW = (
+        'reflexivity', 'open society', 'market fundamentalism',
+        'boom-bust', 'bubble', 'regulation', 'democracy',
+        'capitalism', 'globalization', 'inequality'
+    )
+    
+    # Shared by every instance; finds all keywords in a single pass however many there are
+    _KW_AUTOMATON = _build_keyword_automaton(_SOROS_KW)
+    
+    def __init__(
+        self,
+        data_dir: str = "data/soros",
+        embedding_model: Optional[str] = None,
+        semantic_threshold: float = 0.45
+    ):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
@@ -66,6 +120,10 @@ class SorosKnowledgeBase:
             "perspective": "global, long-term, and systemic"
         }
         
+        # Bumped on every writing style change so prompts rendered from it know to re-render
+        self.style_version = 0
+        self._index_vocabulary()
+        
         # Common Soros quotes and themes
         self.soros_quotes = [
             "The financial markets generally are unpredictable. So that one has to have different scenarios... The idea that you can actually predict what's going to happen contradicts my way of looking at the market.",
@@ -78,54 +136,176 @@ class SorosKnowledgeBase:
             "The current crisis is not only the bust that follows the housing boom, but something much bigger: it is the end of a 60-year period of credit expansion based on the dollar as the international reserve currency."
         ]
         
+        # Quotes are kept in order in the list and deduplicated through the set
+        self._quote_set = set(self.soros_quotes)
+        
+        # Set when concept or style changes have not been written to disk yet
+        self._dirty = False
+        
+        # Quotes added since the last save, appended to the quotes file on the next one
+        self.quotes_file = self.data_dir / "quotes.jsonl"
+        self._unsaved_quotes: List[str] = []
+        
+        # Quotes arrive from the PDF quote-writer thread, API worker threads and the exit hook;
+        # reentrant because mutators save while holding it
+        self._lock = threading.RLock()
+        
         self.load_knowledge_base()
+        self._index_concepts()
+        
+        # Anything a failed save left behind gets another chance at interpreter exit; the weak
+        # reference keeps the hook from holding every knowledge base ever created alive
+        atexit.register(_save_at_exit, weakref.ref(self))
+        
+        # Optional embedding index so concept search also finds paraphrases
+        self.concept_index = None
+        if embedding_model:
+            try:
+                from .concept_index import ConceptIndex
+                self.concept_index = ConceptIndex(self.data_dir, embedding_model, semantic_threshold)
+                self.concept_index.build(self.soros_concepts)
+            except Exception as e:
+                logger.warning(f"Semantic concept search disabled: {e}")
+                self.concept_index = None
     
     def load_knowledge_base(self):
         """Load or create the knowledge base"""
         knowledge_file = self.data_dir / "soros_knowledge.json"
         
-        if knowledge_file.exists():
+        try:
+            data = orjson.loads(knowledge_file.read_bytes()) if knowledge_file.exists() else {}
+            self.soros_concepts.update(data.get('concepts', {}))
+            
+            # Style edits saved by update_writing_style() replace the defaults they changed
+            saved_style = data.get('writing_style')
+            if saved_style:
+                self.writing_style.update(saved_style)
+                self.style_version += 1
+                self._index_vocabulary()
+            
+            # Quotes live in an append-only JSONL file; older knowledge files kept them in the JSON
+            if self.quotes_file.exists():
+                saved_quotes, skipped = self._read_quotes()
+            else:
+                saved_quotes, skipped = data.get('quotes', []), 0
+            
+            # The saved quotes repeat the built-in ones, so only unseen ones are added
+            self._add_unseen_quotes(saved_quotes)
+            if data:
+                logger.info("Loaded existing knowledge base")
+            
+            # Rewrite a file only if it is missing, lacks something, e.g. new built-in quotes, or holds duplicates
+            if not self.quotes_file.exists() or skipped or len(saved_quotes) != len(self.soros_quotes):
+                self._rewrite_quotes()
+            if 'quotes' in data or data.get('concepts') != self.soros_concepts:
+                self.save_knowledge_base(force=True)
+        except Exception as e:
+            logger.error(f"Failed to load knowledge base: {e}")
+    
+    def _read_quotes(self) -> tuple:
+        """Read the quotes file line by line, returning the quotes and how many lines were unreadable"""
+        quotes = []
+        skipped = 0
+        with open(self.quotes_file, 'rb') as f:
+            for line in f:
+                try:
+                    quotes.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # e.g. a line cut short by an interrupted append; the file is then rewritten
+                    skipped += 1
+                    logger.warning(f"Skipping unreadable line in {self.quotes_file}")
+        return quotes, skipped
+    
+    def _rewrite_quotes(self):
+        """Write every quote to the quotes file, replacing its contents"""
+        with self._lock:
             try:
-                with open(knowledge_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.soros_concepts.update(data.get('concepts', {}))
-                    self.soros_quotes.extend(data.get('quotes', []))
-                    logger.info("Loaded existing knowledge base")
+                self.quotes_file.write_bytes(b''.join(orjson.dumps(quote) + b'\n' for quote in self.soros_quotes))
+                self._unsaved_quotes.clear()
             except Exception as e:
-                logger.error(f"Failed to load knowledge base: {e}")
-        
-        self.save_knowledge_base()
+                logger.error(f"Failed to save quotes: {e}")
     
-    def save_knowledge_base(self):
-        """Save the knowledge base to file"""
+    def save_knowledge_base(self, force: bool = False):
+        """Save unsaved changes: new quotes are appended, concepts and style rewritten when changed or forced"""
+        with self._lock:
+            self._save_locked(force)
+    
+    def _save_locked(self, force: bool):
+        """Body of save_knowledge_base(); the caller holds the lock"""
+        # Appending costs the size of the new quotes, not of every quote collected so far
+        if self._unsaved_quotes:
+            try:
+                with open(self.quotes_file, 'ab') as f:
+                    f.write(b''.join(orjson.dumps(quote) + b'\n' for quote in self._unsaved_quotes))
+                self._unsaved_quotes.clear()
+            except Exception as e:
+                logger.error(f"Failed to save quotes: {e}")
+        
+        if not (self._dirty or force):
+            return
+        
         knowledge_file = self.data_dir / "soros_knowledge.json"
         
         data = {
             'concepts': self.soros_concepts,
-            'quotes': self.soros_quotes,
             'writing_style': self.writing_style
         }
         
         try:
-            with open(knowledge_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            # Serialized in one pass to UTF-8 bytes and written with a single call
+            knowledge_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            self._dirty = False
             logger.info("Saved knowledge base")
         except Exception as e:
             logger.error(f"Failed to save knowledge base: {e}")
     
     def add_concept(self, concept_name: str, definition: str, key_points: List[str]):
         """Add a new concept to the knowledge base"""
-        self.soros_concepts[concept_name] = {
-            "definition": definition,
-            "key_points": key_points
-        }
-        self.save_knowledge_base()
+        with self._lock:
+            self.soros_concepts[concept_name] = {
+                "definition": definition,
+                "key_points": key_points
+            }
+            self._dirty = True
+            self.save_knowledge_base()
+            self._index_concepts()
+        
+        if self.concept_index:
+            self.concept_index.add(concept_name, self.soros_concepts[concept_name])
+    
+    def _index_concepts(self):
+        """Rebuild the lowercased parallel lists that keyword search scans"""
+        # One list per field instead of per-concept dicts, lowercased once rather than on every search;
+        # key points are joined with NUL, which user text does not contain, so matches stay within a point
+        self._concept_names = list(self.soros_concepts)
+        self._names_lc = [name.lower() for name in self._concept_names]
+        self._defs_lc = [self.soros_concepts[name]['definition'].lower() for name in self._concept_names]
+        self._key_points_lc = [
+            '\0'.join(self.soros_concepts[name]['key_points']).lower() for name in self._concept_names
+        ]
     
     def add_quote(self, quote: str):
         """Add a new quote to the knowledge base"""
-        if quote not in self.soros_quotes:
-            self.soros_quotes.append(quote)
-            self.save_knowledge_base()
+        self.add_quotes([quote])
+    
+    def add_quotes(self, quotes: List[str]):
+        """Add several quotes, saving the knowledge base once if any were new"""
+        # Held from the duplicate check through the flush, so a quote is appended to the file once
+        with self._lock:
+            added = self._add_unseen_quotes(quotes)
+            if added:
+                self._unsaved_quotes.extend(added)
+                self.save_knowledge_base()
+    
+    def _add_unseen_quotes(self, quotes: List[str]) -> List[str]:
+        """Append quotes not already known, in order; returns the ones added"""
+        with self._lock:
+            count = len(self.soros_quotes)
+            for quote in quotes:
+                if quote not in self._quote_set:
+                    self._quote_set.add(quote)
+                    self.soros_quotes.append(quote)
+            return self.soros_quotes[count:]
     
     def get_concept(self, concept_name: str) -> Optional[Dict]:
         """Get a specific concept"""
@@ -133,22 +313,32 @@ class SorosKnowledgeBase:
     
     def get_random_quote(self) -> str:
         """Get a random quote from Soros"""
-        import random
-        return random.choice(self.soros_quotes)
+        return self.soros_quotes[_RNG.randrange(len(self.soros_quotes))]
     
     def search_concepts(self, query: str) -> List[Dict]:
-        """Search concepts by keyword"""
-        results = []
+        """Search concepts by keyword, then by embedding similarity if enabled"""
         query_lower = query.lower()
         
-        for concept_name, concept_data in self.soros_concepts.items():
-            if (query_lower in concept_name.lower() or 
-                query_lower in concept_data['definition'].lower() or
-                any(query_lower in point.lower() for point in concept_data['key_points'])):
-                results.append({
-                    'concept': concept_name,
-                    'data': concept_data
-                })
+        results = [
+            {
+                'concept': concept_name,
+                'data': self.soros_concepts[concept_name]
+            }
+            for concept_name, name, definition, key_points in zip(
+                self._concept_names, self._names_lc, self._defs_lc, self._key_points_lc
+            )
+            if query_lower in name or query_lower in definition or query_lower in key_points
+        ]
+        
+        # Add semantically similar concepts after the keyword matches
+        if self.concept_index:
+            found = {result['concept'] for result in results}
+            for concept_name in self.concept_index.search(query):
+                if concept_name not in found and concept_name in self.soros_concepts:
+                    results.append({
+                        'concept': concept_name,
+                        'data': self.soros_concepts[concept_name]
+                    })
         
         return results
     
@@ -156,14 +346,43 @@ class SorosKnowledgeBase:
         """Get the writing style guide for Soros-like responses"""
         return self.writing_style
     
-    def generate_context_prompt(self, user_query: str) -> str:
-        """Generate a context prompt for the chatbot"""
+    def update_writing_style(self, **fields):
+        """Change entries of the writing style guide, e.g. tone or vocabulary"""
+        with self._lock:
+            self.writing_style.update(fields)
+            self.style_version += 1
+            self._index_vocabulary()
+            
+            self._dirty = True
+            self.save_knowledge_base()
+    
+    def _index_vocabulary(self):
+        """Collect the individual words of the vocabulary, for scoring candidate quotes by overlap"""
+        self._vocabulary_words = frozenset(
+            word for term in self.writing_style['vocabulary'] for word in _WORD_RE.findall(term.lower())
+        )
+    
+    def generate_turn_context(self, user_query: str) -> str:
+        """Generate the retrieved quote and concepts for one question, without the question itself"""
         # Search for relevant concepts
         relevant_concepts = self.search_concepts(user_query)
         
         # Get a relevant quote
         relevant_quote = self.get_random_quote()
         
+        context = f"""Relevant quote: "{relevant_quote}"
+
+"""
+        
+        if relevant_concepts:
+            context += "Relevant concepts:\n"
+            for concept in relevant_concepts[:3]:  # Limit to top 3
+                context += f"- {concept['concept']}: {concept['data']['definition']}\n"
+        
+        return context
+    
+    def generate_context_prompt(self, user_query: str) -> str:
+        """Generate a context prompt for the chatbot"""
         context = f"""You are George Soros, the renowned investor, philanthropist, and philosopher. 
 
 Key aspects of your thinking:
@@ -172,15 +391,8 @@ Key aspects of your thinking:
 - You are critical of market fundamentalism and advocate for proper regulation
 - You think globally and long-term about systemic issues
 
-Relevant quote: "{relevant_quote}"
-
 """
-        
-        if relevant_concepts:
-            context += "Relevant concepts:\n"
-            for concept in relevant_concepts[:3]:  # Limit to top 3
-                context += f"- {concept['concept']}: {concept['data']['definition']}\n"
-        
+        context += self.generate_turn_context(user_query)
         context += f"\nRespond to the user's question in your characteristic philosophical and analytical style: {user_query}"
         
         return context
@@ -193,24 +405,27 @@ Relevant quote: "{relevant_quote}"
             'themes': []
         }
         
-        # Look for potential quotes (text in quotes)
-        quote_pattern = r'"([^"]{20,})"'
-        quotes = re.findall(quote_pattern, pdf_text)
-        extracted['quotes'].extend(quotes[:10])  # Limit to 10
-        
-        # Look for key Soros concepts
-        soros_keywords = [
-            'reflexivity', 'open society', 'market fundamentalism',
-            'boom-bust', 'bubble', 'regulation', 'democracy',
-            'capitalism', 'globalization', 'inequality'
-        ]
+        # Look for potential quotes (text in quotes) and keep the 10 richest in Soros's vocabulary;
+        # ties keep document order
+        candidates = [match.group(1) for match in self._QUOTE_RE.finditer(pdf_text)]
+        extracted['quotes'].extend(heapq.nlargest(10, candidates, key=self.score_quote))
         
-        for keyword in soros_keywords:
-            if keyword.lower() in pdf_text.lower():
-                extracted['concepts'].append(keyword)
+        # Look for key Soros concepts; the text is lowercased once rather than once per keyword
+        text_lc = pdf_text.lower()
+        if self._KW_AUTOMATON is not None:
+            found = {keyword for _, keyword in self._KW_AUTOMATON.iter(text_lc)}
+            extracted['concepts'] = [keyword for keyword in self._SOROS_KW if keyword in found]
+        else:
+            extracted['concepts'] = [keyword for keyword in self._SOROS_KW if keyword in text_lc]
         
         return extracted
     
+    def score_quote(self, quote: str) -> int:
+        """Number of words in a quote that belong to Soros's vocabulary"""
+        # Set membership is a C-level hash lookup per word
+        vocabulary = self._vocabulary_words
+        return sum(word in vocabulary for word in _WORD_RE.findall(quote.lower()))
+    
     def get_all_concepts(self) -> Dict:
         """Get all concepts in the knowledge base"""
         return self.soros_concepts
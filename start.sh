@@ -57,7 +57,7 @@ trap cleanup SIGINT SIGTERM
 # Start the FastAPI backend
 echo "🚀 Starting FastAPI backend on http://localhost:8000"
 cd "$(dirname "$0")"
-python api/main.py &
+python -m api.main &
 BACKEND_PID=$!
 
 # Wait a moment for backend to start